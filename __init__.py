@@ -8,9 +8,11 @@ if "bpy" in locals():
     importlib.reload(properties)
     importlib.reload(panels)
     importlib.reload(operators)
+    importlib.reload(utils)
 
 else:
     from .src import panels, properties, operators
+    from .src.functions import utils
 
 import bpy
 
@@ -25,6 +27,7 @@ def unregister():
     panels.unregister()
     properties.unregister()
     operators.unregister()
+    utils.close_session()
 
 
 if __name__ == "__main__":
@@ -1,39 +1,172 @@
 from io import BytesIO
 import json
-from typing import Optional, Dict
+import logging
+import os
+import re
+import shutil
+import threading
+import uuid
+from typing import TYPE_CHECKING, BinaryIO, Callable, Optional, Dict, Tuple, Union
+from urllib.parse import urlparse
 
 import bpy
-import requests
-from PIL import Image
 
+# requests and Pillow are heavy to import, so defer them to first use
+# to keep add-on registration fast
+if TYPE_CHECKING:
+    import requests
+    from PIL import Image
+
+try:
+    # Optional fast JSON encoder, not bundled with Blender
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Hidden (dot-prefixed) material holding the node setup of generated materials
+TEMPLATE_MATERIAL_NAME = ".Diffusion_Material_Template"
+
+# Name patterns of datablocks created by the diffusion addon:
+# Material_XXX_prompt naming, legacy "Material <id>_<uuid>" names and
+# anything mentioning "diffusion" (covers the Diffusion_ prefix too).
+# The template material is excluded, cleanups must not list or delete it
+DIFFUSION_MATERIAL_RE = re.compile(
+    rf"^(?!{re.escape(TEMPLATE_MATERIAL_NAME)}$)"
+    r"(?:Material_\d+_|.*(?:Material .*_|_.*Material |(?i:diffusion)))"
+)
+DIFFUSION_IMAGE_RE = re.compile(r"Generation_|_output_|(?i:diffusion)")
+
+
+logger = logging.getLogger("blender_material_diffusion")
+logger.setLevel(logging.INFO)
+if not logger.handlers:  # Blender may reload this module
+    logger.addHandler(logging.StreamHandler())
+# Printed by our own handler, a root handler (logging.basicConfig) would
+# print every line a second time
+logger.propagate = False
+
+
+def set_debug_logging(enabled: bool):
+    """Toggle printing of per-request debug messages"""
+    logger.setLevel(logging.DEBUG if enabled else logging.INFO)
+
+
+# Shared session so repeated backend calls reuse pooled keep-alive connections
+_SESSION: Optional["requests.Session"] = None
+# Worker threads may ask for the session at the same time as the main thread
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Get the shared backend session, creating it on first use"""
+    global _SESSION
+    if _SESSION is not None:
+        return _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            return _SESSION
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        session.headers["User-Agent"] = "blender-material-diffusion/1.0.0"
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            # Retry gateway errors of proxied backends, then hand the last
+            # response back so callers still see its status code. Connect
+            # errors and timeouts are not retried, the main thread waits on
+            # some of these requests
+            max_retries=Retry(
+                total=None,
+                connect=0,
+                read=0,
+                status=2,
+                backoff_factor=0.2,
+                status_forcelist=(502, 503, 504),
+                raise_on_status=False,
+            ),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SESSION = session
+        return _SESSION
 
-def get_backend_url() -> str:
-    """Get the current backend URL with validation and normalization"""
-    try:
-        backend_props = bpy.context.scene.backend_properties
-        url = backend_props.url
 
-        # Validate and normalize URL
-        if not url or url.strip() == "":
-            url = "http://127.0.0.1:8188"
-        elif not url.startswith(("http://", "https://")):
-            url = f"http://{url}"
+def close_session():
+    """Release the pooled backend connections"""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+            _SESSION = None
 
-        return url
+
+# (raw URL property, normalized URL) of the last lookup. Keyed on the raw
+# string, so another scene or file with a different URL never reuses it
+_CACHED_URL: Optional[Tuple[str, str]] = None
+
+
+def invalidate_url_cache(self=None, context=None):
+    """Drop the cached backend URL (also usable as a property update callback)"""
+    global _CACHED_URL
+    _CACHED_URL = None
+
+
+def get_backend_url() -> str:
+    """Get the current backend URL with validation and normalization
+
+    Reads the active scene, so it must be called on the main thread.
+    """
+    global _CACHED_URL
+    try:
+        raw_url = bpy.context.scene.backend_properties.url
     except Exception as e:
-        print(f"Error getting backend URL: {e}")
+        logger.error("Error getting backend URL: %s", e)
         return "http://127.0.0.1:8188"  # fallback
 
+    cached = _CACHED_URL
+    if cached is not None and cached[0] == raw_url:
+        return cached[1]
+
+    # Validate and normalize URL
+    url = raw_url
+    if not url or url.strip() == "":
+        url = "http://127.0.0.1:8188"
+    elif not url.startswith(("http://", "https://")):
+        url = f"http://{url}"
+
+    _CACHED_URL = (raw_url, url)
+    return url
+
+
+def encode_json(data: Dict) -> bytes:
+    """Encode a JSON request body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def decode_json(data: bytes):
+    """Decode a JSON document, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def backend_request(
     endpoint: str,
     method: str = "GET",
     params: Optional[Dict] = None,
-    data: Optional[Dict] = None,
+    data: Optional[Union[Dict, BinaryIO]] = None,
     json_data: Optional[Dict] = None,
     files: Optional[Dict] = None,
+    headers: Optional[Dict] = None,
     timeout: int = 15,
-) -> Optional[requests.Response]:
+    base_url: Optional[str] = None,
+) -> Optional["requests.Response"]:
     """
     Unified function for all backend API calls
 
@@ -41,21 +174,25 @@ def backend_request(
         endpoint: API endpoint (e.g., "/view", "/prompt", "/upload/image")
         method: HTTP method ("GET", "POST", etc.)
         params: URL parameters
-        data: Form data
+        data: Form data, or a pre-encoded file-like request body
         json_data: JSON data (will be encoded automatically)
         files: Files for upload
+        headers: Extra request headers (e.g. Content-Type of a raw body)
         timeout: Request timeout in seconds
+        base_url: Backend URL, required off the main thread (default:
+            get_backend_url())
 
     Returns:
         Response object or None if failed
     """
-    base_url = get_backend_url()
+    if base_url is None:
+        base_url = get_backend_url()
     url = f"{base_url}{endpoint}"
 
     try:
-        print(f"Backend request: {method} {url}")
+        logger.debug("Backend request: %s %s", method, url)
         if params:
-            print(f"   Params: {params}")
+            logger.debug("   Params: %s", params)
 
         # Prepare request arguments - use a dict that can hold any type
         kwargs = {}
@@ -70,54 +207,153 @@ def backend_request(
             kwargs["data"] = data
         if files:
             kwargs["files"] = files
+        if headers:
+            kwargs["headers"] = headers
 
         # Handle JSON data
         if json_data:
-            kwargs["data"] = json.dumps(json_data).encode("utf-8")
-            kwargs["headers"] = {"Content-Type": "application/json"}
+            kwargs["data"] = encode_json(json_data)
+            kwargs["headers"] = {**(headers or {}), "Content-Type": "application/json"}
 
-        print(f"   Request kwargs keys: {list(kwargs.keys())}")
+        logger.debug("   Request kwargs keys: %s", list(kwargs))
 
-        # Make request
-        if method.upper() == "GET":
-            response = requests.get(url, **kwargs)
-        elif method.upper() == "POST":
-            response = requests.post(url, **kwargs)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+        # Make request through the shared session
+        response = get_session().request(method.upper(), url, **kwargs)
 
-        print(f"Response: {response.status_code}")
+        logger.debug("Response: %s", response.status_code)
         return response
 
     except Exception as e:
-        print(f"Backend request failed - URL: {url}, Error: {e}")
+        logger.error("Backend request failed - URL: %s, Error: %s", url, e)
+        return None
+
+
+def backend_download(
+    endpoint: str,
+    dest_path: str,
+    params: Optional[Dict] = None,
+    timeout: int = 15,
+    base_url: Optional[str] = None,
+) -> Optional["requests.Response"]:
+    """
+    Stream the body of a GET request into a file
+
+    The file is only written on HTTP 200, in 64 KiB chunks, so large
+    results never sit in memory as a whole. Runs on worker threads, which
+    must pass the base_url resolved on the main thread.
+
+    Returns:
+        Response object (body already consumed) or None if the request
+        failed. Errors opening or writing dest_path are raised (OSError)
+    """
+    import requests
+
+    if base_url is None:
+        base_url = get_backend_url()
+    url = f"{base_url}{endpoint}"
+    try:
+        logger.debug("Backend request: GET %s %s", url, params)
+        response = get_session().get(url, params=params, timeout=timeout, stream=True)
+    except Exception as e:
+        logger.error("Backend download failed - URL: %s, Error: %s", url, e)
         return None
 
+    with response:
+        logger.debug("Response: %s", response.status_code)
+        if response.status_code == 200:
+            with open(dest_path, "wb") as dest:
+                try:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        dest.write(chunk)
+                except requests.RequestException as e:
+                    # Only the network side, file errors reach the caller
+                    logger.error("Backend download failed - URL: %s, Error: %s", url, e)
+                    return None
+        return response
+
+
+def is_local_backend() -> bool:
+    """Whether the backend runs on this machine (loopback address)"""
+    host = urlparse(get_backend_url()).hostname
+    return host in ("127.0.0.1", "localhost", "::1")
 
-def convert_to_bytes(image: Image.Image):
 
-    buffer = BytesIO()
-    image.save(buffer, format="PNG")
-    buffer.seek(0)
+def encode_multipart(
+    fields: Dict[str, str],
+    file_field: str,
+    file_name: str,
+    file_type: str,
+    write_file: Callable[[BinaryIO], object],
+) -> Tuple[BytesIO, str]:
+    """
+    Build a multipart/form-data body in a single buffer
+
+    The file payload is written straight after its part header by
+    `write_file`, so the body never holds a second copy of the file
+    (requests' own multipart encoding copies the whole payload again).
 
-    return buffer
+    Returns:
+        The body rewound to the start, and its Content-Type header value
+    """
+    boundary = uuid.uuid4().hex
+    body = BytesIO()
+
+    for name, value in fields.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+            f"\r\n\r\n{value}\r\n".encode("utf-8")
+        )
+
+    safe_name = file_name.replace('"', "%22")
+    body.write(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+        f'filename="{safe_name}"\r\nContent-Type: {file_type}\r\n\r\n'.encode("utf-8")
+    )
+    write_file(body)
+    body.write(f"\r\n--{boundary}--\r\n".encode("utf-8"))
+    body.seek(0)
+
+    return body, f"multipart/form-data; boundary={boundary}"
 
 
 # pyright: reportAttributeAccessIssue=false
 
 
-def send_image_function(scene: bpy.types.Scene, image_name: str, image: Image.Image):
+def write_png(buffer: BinaryIO, image: "Image.Image", source_path: Optional[str]):
+    """Write PNG bytes, copying them from source_path when the caller passes an unmodified PNG"""
+    if source_path and source_path.lower().endswith(".png"):
+        if os.path.isfile(source_path):
+            with open(source_path, "rb") as source:
+                shutil.copyfileobj(source, buffer)
+            return
+
+    # On loopback bandwidth is free, so favour encode speed
+    compress_level = 1 if is_local_backend() else 6
+    image.save(buffer, format="PNG", compress_level=compress_level)
+
+
+def send_image_function(
+    scene: bpy.types.Scene,
+    image_name: str,
+    image: "Image.Image",
+    source_path: Optional[str] = None,
+):
     """Send the image to the comfyUI backend"""
 
     # Send Image
-    buffer = convert_to_bytes(image)
-    files = {"image": (image_name, buffer, "image/png")}
-
-    data = {
-        "type": "input",
-        "overwrite": "true",
-    }
+    body, content_type = encode_multipart(
+        {"type": "input", "overwrite": "true"},
+        "image",
+        image_name,
+        "image/png",
+        lambda buffer: write_png(buffer, image, source_path),
+    )
 
-    response = backend_request("/upload/image", method="POST", files=files, data=data)
+    response = backend_request(
+        "/upload/image",
+        method="POST",
+        data=body,
+        headers={"Content-Type": content_type},
+    )
 
     return response.status_code if response else 500
@@ -1,5 +1,7 @@
 import bpy
 
+from ..functions.utils import DIFFUSION_IMAGE_RE, DIFFUSION_MATERIAL_RE
+
 
 class CleanupOrphanedOperator(bpy.types.Operator):
     bl_idname = "diffusion.cleanup_orphaned"
@@ -11,21 +13,14 @@ class CleanupOrphanedOperator(bpy.types.Operator):
         return context.window_manager.invoke_confirm(self, event)
 
     def execute(self, context):
-        removed_materials = 0
-        removed_images = 0
-
-        # Remove orphaned materials
-        for mat in list(bpy.data.materials):
-            if mat.users == 0:
-                bpy.data.materials.remove(mat)
-                removed_materials += 1
-
-        # Remove orphaned images
-        for img in list(bpy.data.images):
-            if img.users == 0:
-                bpy.data.images.remove(img)
-                removed_images += 1
-
+        # Materials go first so images they alone used are orphaned by then
+        materials = [mat for mat in bpy.data.materials if mat.users == 0]
+        bpy.data.batch_remove(ids=materials)
+        images = [img for img in bpy.data.images if img.users == 0]
+        bpy.data.batch_remove(ids=images)
+
+        removed_materials = len(materials)
+        removed_images = len(images)
         total_removed = removed_materials + removed_images
         self.report(
             {"INFO"},
@@ -44,39 +39,17 @@ class CleanupAllDiffusionOperator(bpy.types.Operator):
         return context.window_manager.invoke_confirm(self, event)
 
     def execute(self, context):
-        removed_materials = 0
-        removed_images = 0
-
-        # Remove diffusion materials
-        for mat in list(bpy.data.materials):
-            if (
-                mat.name.startswith("Diffusion_")
-                or
-                # Material_XXX_prompt pattern (specific diffusion naming)
-                (
-                    mat.name.startswith("Material_")
-                    and len(mat.name.split("_")) >= 3
-                    and mat.name.split("_")[1].isdigit()
-                )
-                or
-                # Legacy patterns
-                ("Material " in mat.name and "_" in mat.name)
-                or "diffusion" in mat.name.lower()
-            ):
-                bpy.data.materials.remove(mat)
-                removed_materials += 1
-
-        # Remove diffusion images
-        for img in list(bpy.data.images):
-            if (
-                img.name.startswith("Diffusion_")
-                or ("Generation_" in img.name)
-                or ("_output_" in img.name)
-                or ("diffusion" in img.name.lower())
-            ):
-                bpy.data.images.remove(img)
-                removed_images += 1
+        # Collect diffusion materials and images
+        materials = [
+            m for m in bpy.data.materials if DIFFUSION_MATERIAL_RE.search(m.name)
+        ]
+        images = [i for i in bpy.data.images if DIFFUSION_IMAGE_RE.search(i.name)]
+
+        # Remove everything in a single call
+        bpy.data.batch_remove(ids=materials + images)
 
+        removed_materials = len(materials)
+        removed_images = len(images)
         total_removed = removed_materials + removed_images
         self.report(
             {"INFO"},
@@ -95,25 +68,11 @@ class CleanupMaterialsOperator(bpy.types.Operator):
         return context.window_manager.invoke_confirm(self, event)
 
     def execute(self, context):
-        removed_count = 0
-
-        for mat in list(bpy.data.materials):
-            if (
-                mat.name.startswith("Diffusion_")
-                or
-                # Material_XXX_prompt pattern (specific diffusion naming)
-                (
-                    mat.name.startswith("Material_")
-                    and len(mat.name.split("_")) >= 3
-                    and mat.name.split("_")[1].isdigit()
-                )
-                or
-                # Legacy patterns
-                ("Material " in mat.name and "_" in mat.name)
-                or "diffusion" in mat.name.lower()
-            ):
-                bpy.data.materials.remove(mat)
-                removed_count += 1
+        targets = [
+            m for m in bpy.data.materials if DIFFUSION_MATERIAL_RE.search(m.name)
+        ]
+        bpy.data.batch_remove(ids=targets)
+        removed_count = len(targets)
 
         self.report({"INFO"}, f"Removed {removed_count} diffusion materials")
         return {"FINISHED"}
@@ -129,17 +88,9 @@ class CleanupImagesOperator(bpy.types.Operator):
         return context.window_manager.invoke_confirm(self, event)
 
     def execute(self, context):
-        removed_count = 0
-
-        for img in list(bpy.data.images):
-            if (
-                img.name.startswith("Diffusion_")
-                or ("Generation_" in img.name)
-                or ("_output_" in img.name)
-                or ("diffusion" in img.name.lower())
-            ):
-                bpy.data.images.remove(img)
-                removed_count += 1
+        targets = [i for i in bpy.data.images if DIFFUSION_IMAGE_RE.search(i.name)]
+        bpy.data.batch_remove(ids=targets)
+        removed_count = len(targets)
 
         self.report({"INFO"}, f"Removed {removed_count} diffusion images")
         return {"FINISHED"}
@@ -203,8 +154,18 @@ class HistoryCleanupOperator(bpy.types.Operator):
         return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
+        # Import the utility function for naming
+        from ..operators.history_collection_operators import (
+            create_user_friendly_name,
+        )
+
         history_props = context.scene.history_properties
         items_to_remove = []
+        doomed = []
+
+        # Snapshot existing names so missing datablocks skip the RNA lookup
+        mat_names = {mat.name for mat in bpy.data.materials}
+        img_names = {img.name for img in bpy.data.images}
 
         for i, item in enumerate(history_props.history_collection):
             should_remove = False
@@ -219,40 +180,35 @@ class HistoryCleanupOperator(bpy.types.Operator):
             if should_remove:
                 items_to_remove.append(i)
 
-                # Import the utility function for naming
-                from ..operators.history_collection_operators import (
-                    create_user_friendly_name,
-                )
-
                 # Remove associated material using new naming pattern
                 material_name = create_user_friendly_name(
                     item.prompt, item.id, "Material", 20
                 )
-                mat = bpy.data.materials.get(material_name)
-                if mat:
-                    bpy.data.materials.remove(mat)
+                if material_name in mat_names:
+                    doomed.append(bpy.data.materials[material_name])
                 else:
                     # Fallback to old naming pattern
                     old_mat_name = f"Material {item.id}_{item.uuid}"
-                    mat = bpy.data.materials.get(old_mat_name)
-                    if mat:
-                        bpy.data.materials.remove(mat)
+                    if old_mat_name in mat_names:
+                        doomed.append(bpy.data.materials[old_mat_name])
 
                 # Remove associated image using new naming pattern
                 image_name = (
                     create_user_friendly_name(item.prompt, item.id, "Diffusion", 20)
                     + ".png"
                 )
-                img = bpy.data.images.get(image_name)
-                if img:
-                    bpy.data.images.remove(img)
+                if image_name in img_names:
+                    doomed.append(bpy.data.images[image_name])
                 else:
                     # Fallback to old naming pattern
                     old_img_name = f"Generation_{item.id}_{item.uuid}.png"
-                    img = bpy.data.images.get(old_img_name)
-                    if img:
-                        # Remove history items in reverse order to maintain indices
-                        bpy.data.images.remove(img)
+                    if old_img_name in img_names:
+                        doomed.append(bpy.data.images[old_img_name])
+
+        # Remove all associated materials and images in a single call
+        bpy.data.batch_remove(ids=doomed)
+
+        # Remove history items in reverse order to maintain indices
         for i in reversed(items_to_remove):
             history_props.history_collection.remove(i)
 
@@ -1,103 +1,155 @@
-import json
+import functools
+import operator
 import random
 import uuid
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Optional, Set
+from time import perf_counter
+from typing import Dict, Optional, Set, Tuple
 
 import bpy
 
 # Import our centralized backend function
-from ..functions.utils import backend_request
+from ..functions.utils import TEMPLATE_MATERIAL_NAME, backend_request, decode_json
+from .history_collection_operators import start_fetch_timer
+from ..properties.history_properties import (
+    find_history_item_by_id,
+    find_history_item_by_uuid,
+    index_history_item,
+    update_history_display,
+)
 
 # pyright: reportAttributeAccessIssue=false
 
 
-class PromptEnhancer:
-    """Handles prompt enhancement with quality terms"""
+# Private generator for random seeds, same range as randint(1, 1000000)
+_seed_rng = random.Random()
 
-    @staticmethod
-    def get_enhanced_prompts(diffusion_props):
-        """Get enhanced prompts based on user settings"""
-        base_prompt = diffusion_props.prompt.strip()
-        base_negative = diffusion_props.negative_prompt.strip()
+_WORKFLOWS_DIR = Path(__file__).resolve().parent.parent.parent / "workflows"
 
-        if diffusion_props.enhance_prompt:
-            # Add quality enhancement to positive prompt
-            quality_suffix = diffusion_props.quality_prompt_suffix.strip()
-            if quality_suffix:
-                enhanced_prompt = (
-                    f"{base_prompt}, {quality_suffix}"
-                    if base_prompt
-                    else quality_suffix
-                )
-            else:
-                enhanced_prompt = base_prompt
-
-            # Add quality negative terms
-            quality_negative = diffusion_props.quality_negative_prompt.strip()
-            if quality_negative:
-                enhanced_negative = (
-                    f"{base_negative}, {quality_negative}"
-                    if base_negative
-                    else quality_negative
-                )
-            else:
-                enhanced_negative = base_negative
-        else:
-            # Use prompts as-is
-            enhanced_prompt = base_prompt
-            enhanced_negative = base_negative
 
-        return enhanced_prompt, enhanced_negative
+@functools.lru_cache(maxsize=4)
+def _load_workflow(name: str) -> dict:
+    """Parse a bundled workflow once; callers must copy before mutating"""
+    json_path = _WORKFLOWS_DIR / name
+    return decode_json(json_path.read_bytes())
 
 
-class TextureGeneratorCore:
-    """Core texture generation functionality shared between different operators"""
+def _clone_workflow(workflow: dict) -> dict:
+    """Copy a workflow deep enough to patch node inputs
 
-    @staticmethod
-    def create_history_item(
-        context, generation_uuid: str, mesh_name: str = "", create_material: bool = True
-    ):
-        """Create and configure a history item for texture generation"""
-        scene = context.scene
-        history_props = scene.history_properties
-        diffusion_props = scene.diffusion_properties
+    Only the per-node dicts and their "inputs" are copied; patching replaces
+    input values (including link lists) instead of mutating them, so the
+    remaining values can be shared with the cached workflow.
+    """
+    return {
+        node_id: {**node, "inputs": dict(node["inputs"])}
+        for node_id, node in workflow.items()
+    }
 
-        # Get enhanced prompts
-        enhanced_prompt, enhanced_negative = PromptEnhancer.get_enhanced_prompts(
-            diffusion_props
-        )
 
-        # Create new history item
-        new_history_item = history_props.history_collection.add()
-        new_history_item.id = history_props.history_counter
-        new_history_item.uuid = generation_uuid
-        new_history_item.prompt = enhanced_prompt  # Use enhanced prompt
-        new_history_item.negative_prompt = enhanced_negative  # Use enhanced negative
-        new_history_item.seed = diffusion_props.seed
-        new_history_item.cfg_scale = diffusion_props.cfg_scale
-        new_history_item.n_steps = diffusion_props.n_steps
-        new_history_item.scheduler = diffusion_props.scheduler
-        new_history_item.width = diffusion_props.width
-        new_history_item.height = diffusion_props.height
-        new_history_item.mesh_name = mesh_name
-        new_history_item.texture_only = not create_material
-        new_history_item.model_name = diffusion_props.models_available
-        new_history_item.status = "GENERATING"
-        new_history_item.created_time = __import__("time").perf_counter()
-
-        # Increment counter
-        history_props.history_counter += 1
-
-        return new_history_item
-
-    @staticmethod
-    def start_generation_pipeline(context, generation_uuid: str):
-        """Start the complete generation pipeline"""
-        # Skip update_history since we already created the complete history item
-        # Just send request and start monitoring
-        bpy.ops.diffusion.send_request(uuid=generation_uuid)
-        bpy.ops.diffusion.fetch_history(uuid=generation_uuid)
+@dataclass(slots=True)
+class GenerationSettings:
+    """Snapshot of the diffusion properties a generation reads"""
+
+    prompt: str
+    negative_prompt: str
+    enhance_prompt: bool
+    quality_prompt_suffix: str
+    quality_negative_prompt: str
+    seed: int
+    random_seed: bool
+    cfg_scale: float
+    n_steps: int
+    sampler_name: str
+    scheduler: str
+    width: int
+    height: int
+    models_available: str
+    loras_available: str
+    lora_scale: float
+    upscaler_available: str
+
+    @classmethod
+    def from_props(cls, diffusion_props) -> "GenerationSettings":
+        return cls(*_get_snapshot_values(diffusion_props))
+
+
+_get_snapshot_values = operator.attrgetter(
+    *(field.name for field in fields(GenerationSettings))
+)
+
+# Settings captured at history item creation, consumed when the request is sent
+_pending_settings: Dict[str, GenerationSettings] = {}
+
+# Generation settings copied as-is from the diffusion properties to history
+_HISTORY_SETTINGS = ("seed", "cfg_scale", "n_steps", "scheduler", "width", "height")
+_get_history_settings = operator.attrgetter(*_HISTORY_SETTINGS)
+
+
+# Prompt enhancement with quality terms
+def get_enhanced_prompts(diffusion_props):
+    """Get enhanced prompts based on user settings"""
+    base_prompt = diffusion_props.prompt.strip()
+    base_negative = diffusion_props.negative_prompt.strip()
+
+    if not diffusion_props.enhance_prompt:
+        # Use prompts as-is
+        return base_prompt, base_negative
+
+    # Append quality terms, skipping whichever side is empty
+    quality_suffix = diffusion_props.quality_prompt_suffix.strip()
+    quality_negative = diffusion_props.quality_negative_prompt.strip()
+
+    enhanced_prompt = ", ".join(part for part in (base_prompt, quality_suffix) if part)
+    enhanced_negative = ", ".join(
+        part for part in (base_negative, quality_negative) if part
+    )
+
+    return enhanced_prompt, enhanced_negative
+
+
+# Core texture generation functionality shared between different operators
+def _create_history_item(
+    context, generation_uuid: str, mesh_name: str = "", create_material: bool = True
+):
+    """Create and configure a history item for texture generation"""
+    scene = context.scene
+    history_props = scene.history_properties
+    # Read the properties once, the request sent next reuses the snapshot
+    settings = GenerationSettings.from_props(scene.diffusion_properties)
+    _pending_settings[generation_uuid] = settings
+
+    # Get enhanced prompts
+    enhanced_prompt, enhanced_negative = get_enhanced_prompts(settings)
+
+    # Create new history item
+    new_history_item = history_props.history_collection.add()
+    new_history_item.id = history_props.history_counter
+    new_history_item.uuid = generation_uuid
+    new_history_item.prompt = enhanced_prompt  # Use enhanced prompt
+    new_history_item.negative_prompt = enhanced_negative  # Use enhanced negative
+    for name, value in zip(_HISTORY_SETTINGS, _get_history_settings(settings)):
+        setattr(new_history_item, name, value)
+    new_history_item.mesh_name = mesh_name
+    new_history_item.texture_only = not create_material
+    new_history_item.model_name = settings.models_available
+    new_history_item.status = "GENERATING"
+    new_history_item.created_time = perf_counter()
+    update_history_display(new_history_item)
+
+    # Increment counter
+    history_props.history_counter += 1
+    index_history_item(history_props, new_history_item)
+
+    return new_history_item
+
+
+def _start_generation_pipeline(context, generation_uuid: str):
+    """Start the complete generation pipeline"""
+    # Skip update_history since we already created the complete history item
+    # Just send request and start monitoring, in a single operator call
+    bpy.ops.diffusion.send_and_fetch(uuid=generation_uuid)
 
 
 class TextureGenerator(bpy.types.Operator):
@@ -129,7 +181,7 @@ class TextureGenerator(bpy.types.Operator):
                 return {"CANCELLED"}
 
             # Create history item
-            TextureGeneratorCore.create_history_item(
+            _create_history_item(
                 context, generation_uuid, mesh_name, create_material=True
             )
 
@@ -148,12 +200,12 @@ class TextureGenerator(bpy.types.Operator):
                 return {"CANCELLED"}
 
             # Create history item with mesh reference
-            TextureGeneratorCore.create_history_item(
+            _create_history_item(
                 context, generation_uuid, active_object.name, create_material=False
             )
 
         # Start generation pipeline
-        TextureGeneratorCore.start_generation_pipeline(context, generation_uuid)
+        _start_generation_pipeline(context, generation_uuid)
 
         if self.create_material:
             self.report({"INFO"}, "Material generation started")
@@ -163,266 +215,345 @@ class TextureGenerator(bpy.types.Operator):
         return {"FINISHED"}
 
 
-class MaterialCreator:
-    """Handles material creation and texture application logic"""
+def _sockets_by_name(sockets) -> dict:
+    """Map socket names to sockets, keeping the first of duplicate names"""
+    by_name = {}
+    for socket in sockets:
+        by_name.setdefault(socket.name, socket)
+    return by_name
+
+
+# Initial values of the diffusion control group inputs
+_CONTROL_DEFAULTS = (
+    ("Brightness", 0.0),
+    ("Contrast", 0.0),
+    ("Saturation", 1.0),
+    ("Hue Shift", 0.5),
+    ("Roughness", 0.8),
+    ("Bump Strength", 0.1),
+    ("Metallic", 0.0),
+    ("Displacement", 0.05),
+)
+
+
+# Material creation and texture application logic
+def create_diffusion_control_nodegroup():
+    """Create a reusable node group for diffusion material controls"""
+    # Check if the node group already exists
+    group = bpy.data.node_groups.get("Diffusion_Material_Controls")
+    if group is not None:
+        return group
 
-    @staticmethod
-    def create_diffusion_control_nodegroup():
-        """Create a reusable node group for diffusion material controls"""
-        # Check if the node group already exists
-        if "Diffusion_Material_Controls" in bpy.data.node_groups:
-            return bpy.data.node_groups["Diffusion_Material_Controls"]
+    # Create new node group
+    group = bpy.data.node_groups.new("Diffusion_Material_Controls", "ShaderNodeTree")
 
-        # Create new node group
-        group = bpy.data.node_groups.new(
-            "Diffusion_Material_Controls", "ShaderNodeTree"
-        )
+    # Create group input/output nodes
+    group_input = group.nodes.new("NodeGroupInput")
+    group_output = group.nodes.new("NodeGroupOutput")
 
-        # Create group input/output nodes
-        group_input = group.nodes.new("NodeGroupInput")
-        group_output = group.nodes.new("NodeGroupOutput")
+    # Add input sockets (Blender 4.5 API)
+    group.interface.new_socket(
+        name="Image", in_out="INPUT", socket_type="NodeSocketColor"
+    )
+    group.interface.new_socket(
+        name="Brightness", in_out="INPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Contrast", in_out="INPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Saturation", in_out="INPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Hue Shift", in_out="INPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Roughness", in_out="INPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Bump Strength", in_out="INPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Metallic", in_out="INPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Displacement", in_out="INPUT", socket_type="NodeSocketFloat"
+    )
 
-        # Add input sockets (Blender 4.5 API)
-        group.interface.new_socket(
-            name="Image", in_out="INPUT", socket_type="NodeSocketColor"
-        )
-        group.interface.new_socket(
-            name="Brightness", in_out="INPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Contrast", in_out="INPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Saturation", in_out="INPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Hue Shift", in_out="INPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Roughness", in_out="INPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Bump Strength", in_out="INPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Metallic", in_out="INPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Displacement", in_out="INPUT", socket_type="NodeSocketFloat"
-        )
+    # Add output sockets
+    group.interface.new_socket(
+        name="Base Color", in_out="OUTPUT", socket_type="NodeSocketColor"
+    )
+    group.interface.new_socket(
+        name="Roughness", in_out="OUTPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Normal", in_out="OUTPUT", socket_type="NodeSocketVector"
+    )
+    group.interface.new_socket(
+        name="Metallic", in_out="OUTPUT", socket_type="NodeSocketFloat"
+    )
+    group.interface.new_socket(
+        name="Displacement", in_out="OUTPUT", socket_type="NodeSocketVector"
+    )
 
-        # Add output sockets
-        group.interface.new_socket(
-            name="Base Color", in_out="OUTPUT", socket_type="NodeSocketColor"
-        )
-        group.interface.new_socket(
-            name="Roughness", in_out="OUTPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Normal", in_out="OUTPUT", socket_type="NodeSocketVector"
-        )
-        group.interface.new_socket(
-            name="Metallic", in_out="OUTPUT", socket_type="NodeSocketFloat"
-        )
-        group.interface.new_socket(
-            name="Displacement", in_out="OUTPUT", socket_type="NodeSocketVector"
-        )
+    # Create internal nodes
+    hue_sat = group.nodes.new("ShaderNodeHueSaturation")
+    bright_contrast = group.nodes.new("ShaderNodeBrightContrast")
+    rgb_to_bw = group.nodes.new("ShaderNodeRGBToBW")
+    bump = group.nodes.new("ShaderNodeBump")
+    displacement = group.nodes.new("ShaderNodeDisplacement")
+    bump_colorramp = group.nodes.new("ShaderNodeValToRGB")
+    displacement_colorramp = group.nodes.new("ShaderNodeValToRGB")
+
+    # Position nodes
+    group_input.location = (-800, 0)
+    hue_sat.location = (-550, 300)
+    bright_contrast.location = (-300, 300)
+    rgb_to_bw.location = (-550, -100)
+    bump_colorramp.location = (-400, -100)
+    bump.location = (-200, -100)
+    displacement_colorramp.location = (-400, -350)
+    displacement.location = (-200, -350)
+    group_output.location = (50, 0)
+
+    # Create links; the group sockets are linked repeatedly, so map them
+    # by name once
+    group_in = _sockets_by_name(group_input.outputs)
+    group_out = _sockets_by_name(group_output.inputs)
+    bw_value = rgb_to_bw.outputs["Val"]
+
+    links = group.links
+    links.new(group_in["Image"], hue_sat.inputs["Color"])
+    links.new(group_in["Hue Shift"], hue_sat.inputs["Hue"])
+    links.new(group_in["Saturation"], hue_sat.inputs["Saturation"])
+    links.new(hue_sat.outputs["Color"], bright_contrast.inputs["Color"])
+    links.new(group_in["Brightness"], bright_contrast.inputs["Bright"])
+    links.new(group_in["Contrast"], bright_contrast.inputs["Contrast"])
+    links.new(group_in["Image"], rgb_to_bw.inputs["Color"])
+    links.new(bw_value, bump_colorramp.inputs["Fac"])
+    links.new(bump_colorramp.outputs["Color"], bump.inputs["Height"])
+    links.new(group_in["Bump Strength"], bump.inputs["Strength"])
+    links.new(bw_value, displacement_colorramp.inputs["Fac"])
+    links.new(displacement_colorramp.outputs["Color"], displacement.inputs["Height"])
+    links.new(group_in["Displacement"], displacement.inputs["Scale"])
+    links.new(bright_contrast.outputs["Color"], group_out["Base Color"])
+    links.new(group_in["Roughness"], group_out["Roughness"])
+    links.new(bump.outputs["Normal"], group_out["Normal"])
+    links.new(group_in["Metallic"], group_out["Metallic"])
+    links.new(displacement.outputs["Displacement"], group_out["Displacement"])
+
+    return group
+
+
+def get_texture_image(history_item):
+    """Get the texture image from Blender's data"""
+    # Try new naming system first, fallback to old system
+    if hasattr(history_item, "image_name") and history_item.image_name:
+        image_name = history_item.image_name.replace(".png", "")
+    else:
+        image_name = f"Generation_{history_item.id}_{history_item.uuid}"
+
+    # Find image in Blender's data
+    png_name = image_name + ".png"
+    images = bpy.data.images
+    return images.get(png_name) or images.get(image_name)
+
+
+def apply_texture_only(material, texture_image):
+    """Apply texture to existing material (simple mode)"""
+    tree = material.node_tree
+    if not tree:
+        return False
+
+    nodes = tree.nodes
+    links = tree.links
+
+    # Index the first node of each type in a single pass
+    nodes_by_type = {}
+    for node in nodes:
+        nodes_by_type.setdefault(node.type, node)
+
+    # Find existing image texture node
+    image_node = nodes_by_type.get("TEX_IMAGE")
+
+    if image_node:
+        # Replace existing image
+        image_node.image = texture_image
+    else:
+        # Create basic image node
+        image_node = nodes.new("ShaderNodeTexImage")
+        image_node.image = texture_image
+        image_node.location = (-300, 300)
+
+        # Connect to principled BSDF
+        principled = nodes_by_type.get("BSDF_PRINCIPLED")
+
+        if principled:
+            links.new(image_node.outputs["Color"], principled.inputs["Base Color"])
+
+    return True
+
+
+def get_template_material():
+    """Get the hidden material every generated material is copied from"""
+    template = bpy.data.materials.get(TEMPLATE_MATERIAL_NAME)
+    if template is not None:
+        if not template.use_fake_user:  # Template saved by an older version
+            template.use_fake_user = True
+        return template
+
+    # Create material; the fake user keeps the unused template out of the
+    # orphan counts and purges
+    material = bpy.data.materials.new(name=TEMPLATE_MATERIAL_NAME)
+    material.use_fake_user = True
+    material.use_nodes = True
+
+    tree = material.node_tree
+    nodes = tree.nodes
+    links = tree.links
+
+    # Create diffusion control group
+    diffusion_control_group = create_diffusion_control_nodegroup()
+
+    # Create nodes
+    textcoord_node = nodes.new("ShaderNodeTexCoord")
+    mapping_node = nodes.new("ShaderNodeMapping")
+    image_node = nodes.new("ShaderNodeTexImage")
+    control_node = nodes.new("ShaderNodeGroup")
+
+    # Configure control node
+    control_node.node_tree = diffusion_control_group
+    control_node.name = "Diffusion_Controls"
+    control_node.label = "Diffusion Controls"
+
+    # Set default values
+    control_inputs = control_node.inputs
+    for name, value in _CONTROL_DEFAULTS:
+        control_inputs[name].default_value = value
+
+    # Position nodes
+    textcoord_node.location = (-600, 0)
+    mapping_node.location = (-400, 0)
+    image_node.location = (-200, 0)
+    control_node.location = (0, 0)
+
+    # Default nodes of a new node-based material
+    principled = nodes.get("Principled BSDF")
+    material_output = nodes.get("Material Output")
+
+    # Create connections
+    try:
+        # Resolve target sockets by name, their order differs between
+        # Blender versions
+        principled_inputs = principled.inputs
+        base_color_input = principled_inputs["Base Color"]
+        metallic_input = principled_inputs["Metallic"]
+        roughness_input = principled_inputs["Roughness"]
+        normal_input = principled_inputs["Normal"]
+
+        links.new(textcoord_node.outputs[2], mapping_node.inputs[0])
+        links.new(mapping_node.outputs[0], image_node.inputs[0])
+        control_out = _sockets_by_name(control_node.outputs)
+        links.new(image_node.outputs[0], control_node.inputs["Image"])
+        links.new(control_out["Base Color"], base_color_input)
+        links.new(control_out["Roughness"], roughness_input)
+        links.new(control_out["Normal"], normal_input)
+        links.new(control_out["Metallic"], metallic_input)
+        if "Displacement" in control_out:
+            links.new(
+                control_out["Displacement"],
+                material_output.inputs["Displacement"],
+            )
+    except Exception as e:
+        print(f"Warning: Could not create some node connections: {e}")
+        # Fallback to basic connections
+        try:
+            links.new(textcoord_node.outputs[2], mapping_node.inputs[0])
+            links.new(mapping_node.outputs[0], image_node.inputs[0])
+            links.new(image_node.outputs[0], principled.inputs[0])
+        except Exception as e2:
+            print(f"Error: Could not create basic connections: {e2}")
+            bpy.data.materials.remove(material)
+            return None
 
-        # Create internal nodes
-        hue_sat = group.nodes.new("ShaderNodeHueSaturation")
-        bright_contrast = group.nodes.new("ShaderNodeBrightContrast")
-        rgb_to_bw = group.nodes.new("ShaderNodeRGBToBW")
-        bump = group.nodes.new("ShaderNodeBump")
-        displacement = group.nodes.new("ShaderNodeDisplacement")
-        bump_colorramp = group.nodes.new("ShaderNodeValToRGB")
-        displacement_colorramp = group.nodes.new("ShaderNodeValToRGB")
-
-        # Position nodes
-        group_input.location = (-800, 0)
-        hue_sat.location = (-550, 300)
-        bright_contrast.location = (-300, 300)
-        rgb_to_bw.location = (-550, -100)
-        bump_colorramp.location = (-400, -100)
-        bump.location = (-200, -100)
-        displacement_colorramp.location = (-400, -350)
-        displacement.location = (-200, -350)
-        group_output.location = (50, 0)
-
-        # Create links
-        links = group.links
-        links.new(group_input.outputs["Image"], hue_sat.inputs["Color"])
-        links.new(group_input.outputs["Hue Shift"], hue_sat.inputs["Hue"])
-        links.new(group_input.outputs["Saturation"], hue_sat.inputs["Saturation"])
-        links.new(hue_sat.outputs["Color"], bright_contrast.inputs["Color"])
-        links.new(group_input.outputs["Brightness"], bright_contrast.inputs["Bright"])
-        links.new(group_input.outputs["Contrast"], bright_contrast.inputs["Contrast"])
-        links.new(group_input.outputs["Image"], rgb_to_bw.inputs["Color"])
-        links.new(rgb_to_bw.outputs["Val"], bump_colorramp.inputs["Fac"])
-        links.new(bump_colorramp.outputs["Color"], bump.inputs["Height"])
-        links.new(group_input.outputs["Bump Strength"], bump.inputs["Strength"])
-        links.new(rgb_to_bw.outputs["Val"], displacement_colorramp.inputs["Fac"])
-        links.new(
-            displacement_colorramp.outputs["Color"], displacement.inputs["Height"]
-        )
-        links.new(group_input.outputs["Displacement"], displacement.inputs["Scale"])
-        links.new(bright_contrast.outputs["Color"], group_output.inputs["Base Color"])
-        links.new(group_input.outputs["Roughness"], group_output.inputs["Roughness"])
-        links.new(bump.outputs["Normal"], group_output.inputs["Normal"])
-        links.new(group_input.outputs["Metallic"], group_output.inputs["Metallic"])
-        links.new(
-            displacement.outputs["Displacement"], group_output.inputs["Displacement"]
-        )
+    return material
 
-        return group
 
-    @staticmethod
-    def get_texture_image(history_item):
-        """Get the texture image from Blender's data"""
-        # Try new naming system first, fallback to old system
-        if hasattr(history_item, "image_name") and history_item.image_name:
-            image_name = history_item.image_name.replace(".png", "")
-        else:
-            image_name = f"Generation_{history_item.id}_{history_item.uuid}"
+def create_full_material(mesh, history_item, texture_image):
+    """Create complete material with diffusion controls"""
+    from ..operators.history_collection_operators import create_user_friendly_name
 
-        # Find image in Blender's data
-        if image_name + ".png" in bpy.data.images:
-            return bpy.data.images[image_name + ".png"]
-        elif image_name in bpy.data.images:
-            return bpy.data.images[image_name]
+    template = get_template_material()
+    if template is None:
         return None
 
-    @staticmethod
-    def apply_texture_only(material, texture_image):
-        """Apply texture to existing material (simple mode)"""
-        tree = material.node_tree
-        if not tree:
-            return False
+    # Create material name
+    material_name = create_user_friendly_name(
+        history_item.prompt, history_item.id, "Material", 20
+    )
 
-        nodes = tree.nodes
-        links = tree.links
+    # Clone the prebuilt node tree (Blender adds a .001 style suffix on
+    # name clashes)
+    material = template.copy()
+    material.use_fake_user = False
+    material.name = material_name
 
-        # Find existing image texture node
-        image_node = None
-        for node in nodes:
-            if node.type == "TEX_IMAGE":
-                image_node = node
-                break
+    # Set texture
+    for node in material.node_tree.nodes:
+        if node.type == "TEX_IMAGE":
+            node.image = texture_image
+            break
 
-        if image_node:
-            # Replace existing image
-            image_node.image = texture_image
-        else:
-            # Create basic image node
-            image_node = nodes.new("ShaderNodeTexImage")
-            image_node.image = texture_image
-            image_node.location = (-300, 300)
+    # Add material to mesh
+    # mesh.data.materials.append(material)
+    mesh.active_material = material
 
-            # Connect to principled BSDF
-            principled = None
-            for node in nodes:
-                if node.type == "BSDF_PRINCIPLED":
-                    principled = node
-                    break
+    return material
 
-            if principled:
-                links.new(image_node.outputs["Color"], principled.inputs["Base Color"])
 
-        return True
+def apply_texture(history_item) -> Tuple[bool, str]:
+    """Apply the generated texture of a history item to its mesh
 
-    @staticmethod
-    def create_full_material(mesh, history_item, texture_image):
-        """Create complete material with diffusion controls"""
-        from ..operators.history_collection_operators import create_user_friendly_name
+    Plain function so the result polling can call it without the operator
+    overhead (context setup, undo push); ApplyTextureOperator wraps it.
 
-        # Create material name
-        material_name = create_user_friendly_name(
-            history_item.prompt, history_item.id, "Material", 20
-        )
-        base_name = material_name
-        counter = 1
-        while material_name in bpy.data.materials:
-            material_name = f"{base_name}_{counter}"
-            counter += 1
-
-        # Create material
-        material = bpy.data.materials.new(name=material_name)
-        material.use_nodes = True
-
-        tree = material.node_tree
-        nodes = tree.nodes
-        links = tree.links
-
-        # Create diffusion control group
-        diffusion_control_group = MaterialCreator.create_diffusion_control_nodegroup()
-
-        # Create nodes
-        textcoord_node = nodes.new("ShaderNodeTexCoord")
-        mapping_node = nodes.new("ShaderNodeMapping")
-        image_node = nodes.new("ShaderNodeTexImage")
-        control_node = nodes.new("ShaderNodeGroup")
-
-        # Configure control node
-        control_node.node_tree = diffusion_control_group
-        control_node.name = "Diffusion_Controls"
-        control_node.label = "Diffusion Controls"
-
-        # Set default values
-        control_node.inputs["Brightness"].default_value = 0.0
-        control_node.inputs["Contrast"].default_value = 0.0
-        control_node.inputs["Saturation"].default_value = 1.0
-        control_node.inputs["Hue Shift"].default_value = 0.5
-        control_node.inputs["Roughness"].default_value = 0.8
-        control_node.inputs["Bump Strength"].default_value = 0.1
-        control_node.inputs["Metallic"].default_value = 0.0
-        control_node.inputs["Displacement"].default_value = 0.05
-
-        # Position nodes
-        textcoord_node.location = (-600, 0)
-        mapping_node.location = (-400, 0)
-        image_node.location = (-200, 0)
-        control_node.location = (0, 0)
-
-        # Set texture
-        image_node.image = texture_image
+    Returns:
+        Whether the texture was applied, and a message to report
+    """
+    # Validate mesh exists
+    mesh_name = history_item.mesh_name
+    mesh = bpy.data.objects.get(mesh_name)
+    if mesh is None:
+        return False, f"Mesh '{mesh_name}' not found in scene"
 
-        # Create connections
-        try:
-            links.new(textcoord_node.outputs[2], mapping_node.inputs[0])
-            links.new(mapping_node.outputs[0], image_node.inputs[0])
-            links.new(image_node.outputs[0], control_node.inputs["Image"])
-            links.new(
-                control_node.outputs["Base Color"], nodes["Principled BSDF"].inputs[0]
-            )
-            links.new(
-                control_node.outputs["Roughness"], nodes["Principled BSDF"].inputs[2]
-            )
-            links.new(
-                control_node.outputs["Normal"], nodes["Principled BSDF"].inputs[5]
-            )
-            links.new(
-                control_node.outputs["Metallic"], nodes["Principled BSDF"].inputs[1]
-            )
-            if "Displacement" in control_node.outputs:
-                links.new(
-                    control_node.outputs["Displacement"],
-                    nodes["Material Output"].inputs[2],
-                )
-        except Exception as e:
-            print(f"Warning: Could not create some node connections: {e}")
-            # Fallback to basic connections
-            try:
-                links.new(textcoord_node.outputs[2], mapping_node.inputs[0])
-                links.new(mapping_node.outputs[0], image_node.inputs[0])
-                links.new(image_node.outputs[0], nodes["Principled BSDF"].inputs[0])
-            except Exception as e2:
-                print(f"Error: Could not create basic connections: {e2}")
-                return None
+    # Get texture image
+    texture_image = get_texture_image(history_item)
+    if not texture_image:
+        return False, "Texture image not found"
 
-        # Add material to mesh
-        # mesh.data.materials.append(material)
-        mesh.active_material = material
+    # Check if texture-only mode
+    is_texture_only = getattr(history_item, "texture_only", False)
 
-        return material
+    if is_texture_only:
+        # Texture-only: use existing material or create basic one
+        if mesh.active_material:
+            material = mesh.active_material
+        else:
+            material = bpy.data.materials.new(name=f"{mesh.name}_TextureOnly")
+            material.use_nodes = True
+            mesh.data.materials.append(material)
+            mesh.active_material = material
+
+        if not apply_texture_only(material, texture_image):
+            return False, "Failed to apply texture"
+        return True, f"Applied texture to material: {material.name}"
+
+    # Full material creation
+    material = create_full_material(mesh, history_item, texture_image)
+    if not material:
+        return False, "Failed to create material"
+    return True, f"Created material: {material.name}"
 
 
 class ApplyTextureOperator(bpy.types.Operator):
@@ -434,11 +565,8 @@ class ApplyTextureOperator(bpy.types.Operator):
 
     id: bpy.props.IntProperty(name="ID")
 
-    def find_history_item(self, collection):
-        for history_item in collection:
-            if history_item.id == self.id:
-                return history_item
-        return None
+    def find_history_item(self, history_props):
+        return find_history_item_by_id(history_props, self.id)
 
     def execute(self, context: Optional[bpy.types.Context]):
         if not context:
@@ -448,154 +576,104 @@ class ApplyTextureOperator(bpy.types.Operator):
         history_props = scene.history_properties
 
         # Find history item
-        history_item = self.find_history_item(history_props.history_collection)
+        history_item = self.find_history_item(history_props)
         if not history_item:
             self.report({"ERROR"}, "History item not found")
             return {"CANCELLED"}
 
-        # Validate mesh exists
-        mesh_name = history_item.mesh_name
-        if mesh_name not in bpy.data.objects:
-            self.report({"ERROR"}, f"Mesh '{mesh_name}' not found in scene")
-            return {"CANCELLED"}
-
-        mesh = bpy.data.objects[mesh_name]
-
-        # Get texture image
-        texture_image = MaterialCreator.get_texture_image(history_item)
-        if not texture_image:
-            self.report({"ERROR"}, "Texture image not found")
+        success, message = apply_texture(history_item)
+        if not success:
+            self.report({"ERROR"}, message)
             return {"CANCELLED"}
 
-        # Check if texture-only mode
-        is_texture_only = getattr(history_item, "texture_only", False)
-
-        if is_texture_only:
-            # Texture-only: use existing material or create basic one
-            if mesh.active_material:
-                material = mesh.active_material
-            else:
-                material = bpy.data.materials.new(name=f"{mesh.name}_TextureOnly")
-                material.use_nodes = True
-                mesh.data.materials.append(material)
-                mesh.active_material = material
-
-            success = MaterialCreator.apply_texture_only(material, texture_image)
-            if success:
-                self.report({"INFO"}, f"Applied texture to material: {material.name}")
-            else:
-                self.report({"ERROR"}, "Failed to apply texture")
-                return {"CANCELLED"}
-        else:
-            # Full material creation
-            material = MaterialCreator.create_full_material(
-                mesh, history_item, texture_image
-            )
-            if material:
-                self.report({"INFO"}, f"Created material: {material.name}")
-            else:
-                self.report({"ERROR"}, "Failed to create material")
-                return {"CANCELLED"}
-
+        self.report({"INFO"}, message)
         return {"FINISHED"}
 
 
-class SendRequestOperator(bpy.types.Operator):
-    """Operator used to send request to the comfyUI backend"""
-
-    bl_idname = "diffusion.send_request"
-    bl_label = "Send Request"
-    bl_description = "Send a request to the comfyUI backend to generate the image"
+class PromptRequestMixin:
+    """Shared request building for the operators queueing a generation"""
 
     uuid: bpy.props.StringProperty(name="UUID")
 
     # TODO: change from diffusion props to history item props
     def get_history_item(self, context: bpy.types.Context) -> Optional[dict]:
         history_props = context.scene.history_properties
-        for item in history_props.history_collection:
-            if item.uuid == self.uuid:
-                return item
-        return None
+        return find_history_item_by_uuid(history_props, self.uuid)
 
-    def execute(self, context: Optional[bpy.types.Context]) -> Set[str]:
-        assert context is not None
-        assert bpy.context is not None
-
-        scene = context.scene
-        diffusion_props = scene.diffusion_properties
+    def queue_prompt(self, context: bpy.types.Context, history_item) -> bool:
+        """Send the workflow of the history item to the backend queue"""
+        diffusion_props = context.scene.diffusion_properties
+        # Retries have no snapshot, they read the freshly restored properties
+        settings = _pending_settings.pop(self.uuid, None)
+        if settings is None:
+            settings = GenerationSettings.from_props(diffusion_props)
 
         output_prefix = f"blender-texture/{self.uuid}_output"
 
-        # Get History Item to save properties
-        history_item = self.get_history_item(context)
-        if history_item is None:
-            self.report({"ERROR"}, "History item not found")
-            return {"CANCELLED"}
-
         # Prepare Request
 
-        model_name = diffusion_props.models_available
+        model_name = settings.models_available
 
         is_flux = "flux" in model_name.lower()
 
-        if is_flux:
-            json_path = Path(__file__).parent.parent.parent / "workflows" / "flux.json"
-        else:
-            json_path = (
-                Path(__file__).parent.parent.parent / "workflows" / "generic.json"
-            )
-
-        with open(json_path) as f:
-            prompt_workflow_json = f.read()
-        prompt_request = json.loads(prompt_workflow_json)
+        # Copy the cached workflow, the request below patches it in place
+        prompt_request = _clone_workflow(
+            _load_workflow("flux.json" if is_flux else "generic.json")
+        )
 
         # Seed Logic
-        seed = diffusion_props.seed
+        seed = settings.seed
 
-        if diffusion_props.random_seed:
-            seed = random.randint(1, 1000000)
+        if settings.random_seed:
+            seed = _seed_rng.randrange(1, 1_000_001)
             diffusion_props.seed = seed
             history_item.seed = seed
+            update_history_display(history_item)
+
+        # Prompts were enhanced once when the history item was created
+        enhanced_prompt = history_item.prompt
+        enhanced_negative = history_item.negative_prompt
 
-        # Get enhanced prompts for the request
-        enhanced_prompt, enhanced_negative = PromptEnhancer.get_enhanced_prompts(
-            diffusion_props
+        # Bind the patched node inputs once
+        sampler, checkpoint, positive, negative, save = (
+            prompt_request[key]["inputs"] for key in ("3", "4", "6", "7", "9")
         )
 
-        prompt_request["3"]["inputs"]["seed"] = seed
-        prompt_request["4"]["inputs"]["ckpt_name"] = diffusion_props.models_available
+        sampler["seed"] = seed
+        checkpoint["ckpt_name"] = model_name
         # Use enhanced prompt
-        prompt_request["6"]["inputs"]["text"] = enhanced_prompt
+        positive["text"] = enhanced_prompt
         # Use enhanced negative
-        prompt_request["7"]["inputs"]["text"] = enhanced_negative
+        negative["text"] = enhanced_negative
 
         if is_flux:
-            prompt_request["5"]["inputs"]["guidance"] = diffusion_props.cfg_scale
+            prompt_request["5"]["inputs"]["guidance"] = settings.cfg_scale
         else:
-            prompt_request["3"]["inputs"]["cfg"] = diffusion_props.cfg_scale
+            sampler["cfg"] = settings.cfg_scale
 
-        prompt_request["3"]["inputs"]["steps"] = diffusion_props.n_steps
-        prompt_request["3"]["inputs"]["sampler_name"] = diffusion_props.sampler_name
-        prompt_request["3"]["inputs"]["scheduler"] = diffusion_props.scheduler
+        sampler["steps"] = settings.n_steps
+        sampler["sampler_name"] = settings.sampler_name
+        sampler["scheduler"] = settings.scheduler
 
         # Input-Output Name format
-        prompt_request["9"]["inputs"]["filename_prefix"] = output_prefix
+        save["filename_prefix"] = output_prefix
 
-        if diffusion_props.loras_available != "None":
+        lora_name = settings.loras_available
+        if lora_name != "None":
             print("Using LoRA")
-            prompt_request["3"]["inputs"]["model"] = ["2", 0]
-            prompt_request["2"]["inputs"]["lora_name"] = diffusion_props.loras_available
-            prompt_request["2"]["inputs"]["strength_model"] = diffusion_props.lora_scale
-            prompt_request["6"]["inputs"]["clip"] = ["2", 1]
-            prompt_request["7"]["inputs"]["clip"] = ["2", 1]
-
-        if diffusion_props.upscaler_available != "None":
+            lora = prompt_request["2"]["inputs"]
+            sampler["model"] = ["2", 0]
+            lora["lora_name"] = lora_name
+            lora["strength_model"] = settings.lora_scale
+            positive["clip"] = ["2", 1]
+            negative["clip"] = ["2", 1]
+
+        upscaler_name = settings.upscaler_available
+        if upscaler_name != "None":
             print("Using Upscaler")
             prompt_request["38"]["inputs"]["image"] = ["8", 0]
-            prompt_request["9"]["inputs"]["images"] = ["38", 0]
-            prompt_request["37"]["inputs"][
-                "model_name"
-            ] = diffusion_props.upscaler_available
+            save["images"] = ["38", 0]
+            prompt_request["37"]["inputs"]["model_name"] = upscaler_name
             # prompt_request["2"]["inputs"]["strength_model"] = diffusion_props.upscaler_scale
 
         # Send Request to queue
@@ -610,23 +688,74 @@ class SendRequestOperator(bpy.types.Operator):
                 error_msg = f"Backend returned status code: {response.status_code if response else 'No response'}"
                 self.report({"ERROR"}, f"Failed to send request: {error_msg}")
                 print(f"Error sending request: {error_msg}")
-                return {"CANCELLED"}
+                return False
 
         except Exception as e:
             self.report({"ERROR"}, f"Failed to send request: {str(e)}")
             print(f"Error sending request: {e}")
+            return False
+
+        return True
+
+
+class SendRequestOperator(PromptRequestMixin, bpy.types.Operator):
+    """Operator used to send request to the comfyUI backend"""
+
+    bl_idname = "diffusion.send_request"
+    bl_label = "Send Request"
+    bl_description = "Send a request to the comfyUI backend to generate the image"
+
+    def execute(self, context: Optional[bpy.types.Context]) -> Set[str]:
+        assert context is not None
+        assert bpy.context is not None
+
+        # Get History Item to save properties
+        history_item = self.get_history_item(context)
+        if history_item is None:
+            self.report({"ERROR"}, "History item not found")
+            return {"CANCELLED"}
+
+        if not self.queue_prompt(context, history_item):
             return {"CANCELLED"}
 
         return {"FINISHED"}
 
 
+class SendAndFetchOperator(PromptRequestMixin, bpy.types.Operator):
+    """Send the request and start polling for its result in one call"""
+
+    bl_idname = "diffusion.send_and_fetch"
+    bl_label = "Send Request and Fetch"
+    bl_description = "Send a request to the comfyUI backend and wait for the image"
+
+    def execute(self, context: Optional[bpy.types.Context]) -> Set[str]:
+        assert context is not None
+        assert bpy.context is not None
+
+        history_item = self.get_history_item(context)
+        if history_item is None:
+            self.report({"ERROR"}, "History item not found")
+            return {"CANCELLED"}
+
+        # Nothing to wait for if the backend never queued the prompt
+        if not self.queue_prompt(context, history_item):
+            history_item.status = "FAILED"
+            return {"CANCELLED"}
+
+        start_fetch_timer(history_item)
+
+        return {"FINISHED"}
+
+
 def generation_register():
     bpy.utils.register_class(TextureGenerator)
     bpy.utils.register_class(ApplyTextureOperator)
     bpy.utils.register_class(SendRequestOperator)
+    bpy.utils.register_class(SendAndFetchOperator)
 
 
 def generation_unregister():
     bpy.utils.unregister_class(TextureGenerator)
     bpy.utils.unregister_class(ApplyTextureOperator)
     bpy.utils.unregister_class(SendRequestOperator)
+    bpy.utils.unregister_class(SendAndFetchOperator)
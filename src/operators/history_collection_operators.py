@@ -1,18 +1,93 @@
-import functools
-from io import BytesIO
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+from typing import Dict, Optional, Tuple
+import random
+import struct
 import time
 import re
 
 import bpy
-from PIL import Image
 
 # Import our centralized backend function
-from ..functions.utils import backend_request
+from ..functions.utils import backend_download, logger
+from ..properties.history_properties import (
+    find_history_item_by_id,
+    find_history_item_by_uuid,
+    format_elapsed,
+    index_history_item,
+    update_history_display,
+)
 
 # pyright: reportAttributeAccessIssue=false
 
 
+# First and last bytes of every complete PNG file (the IEND chunk and its CRC)
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_END = b"IEND\xaeB`\x82"
+
+
+# Anything but word characters and dashes, which also covers the characters
+# that are unsafe in file names (<>:"/\|?*)
+_RE_BAD = re.compile(r"[^\w\-]")
+
+
+# Result downloads run on worker threads so slow responses never stall
+# Blender; keyed by generation uuid: (future, image name, save path)
+_FETCH_POOL: Optional[ThreadPoolExecutor] = None
+_pending_downloads: Dict[str, Tuple[Future, str, str]] = {}
+
+# How often the main thread checks on a running download, in seconds
+_DOWNLOAD_CHECK_INTERVAL = 0.3
+
+# Generations waiting for their result, all polled by one timer; keyed by
+# generation uuid: (time.monotonic() of the next poll, owning scene pointer).
+# The scene is kept because the item does not live in the active scene
+# once the user switches scenes
+_next_poll: Dict[str, Tuple[float, int]] = {}
+
+# Downloads started at once, one per worker of the fetch pool
+_MAX_PARALLEL_FETCHES = 4
+
+# Bounds of the polling timer interval, in seconds
+_MIN_TICK_INTERVAL = 0.3
+_MAX_TICK_INTERVAL = 2.0
+
+_TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+
+
+def _is_complete_png(path: str) -> bool:
+    """Check the PNG header and IEND trailer without reading the whole file"""
+    with open(path, "rb") as image_file:
+        # Signature, then the IHDR chunk (length, type, width, height)
+        header = image_file.read(24)
+        if not header.startswith(_PNG_SIGNATURE) or header[12:16] != b"IHDR":
+            return False
+        width, height = struct.unpack(">II", header[16:24])
+        if width < 1 or height < 1:
+            return False
+        image_file.seek(-len(_PNG_END), os.SEEK_END)
+        return image_file.read() == _PNG_END
+
+
+# Generation settings stored both on history items and the diffusion properties
+_SHARED_SETTINGS = (
+    "prompt",
+    "seed",
+    "cfg_scale",
+    "n_steps",
+    "scheduler",
+    "negative_prompt",
+)
+
+
+def copy_changed_settings(target, source, names):
+    """Copy attributes from source to target, skipping writes of equal values"""
+    for name in names:
+        value = getattr(source, name)
+        if getattr(target, name) != value:
+            setattr(target, name, value)
+
+
 def create_user_friendly_name(
     prompt: str, item_id: int, prefix: str = "Diffusion", max_length: int = 20
 ) -> str:
@@ -21,91 +96,178 @@ def create_user_friendly_name(
         prompt = "untitled"
 
     # Clean the prompt for safe use in names
-    prompt_clean = prompt[:max_length].replace(" ", "_")
-    prompt_clean = re.sub(r'[<>:"/\\|?*]', "", prompt_clean)
-    prompt_clean = re.sub(r"[^\w\-_]", "", prompt_clean)
+    prompt_clean = _RE_BAD.sub("", prompt[:max_length].replace(" ", "_"))
 
     return f"{prefix}_{item_id:03d}_{prompt_clean}"
 
 
+def _download_result(
+    file_name: str, save_path: str, base_url: str
+) -> Tuple[Optional[int], int, bool]:
+    """Download a result image and check it, runs on a worker thread
+
+    Returns:
+        HTTP status (None if the request failed), size of the downloaded
+        file and whether it is a complete PNG (only then is it saved)
+
+    Raises:
+        OSError: if the file could not be written or moved into place
+    """
+    params = {
+        "filename": file_name,
+        "subfolder": "blender-texture",
+        "type": "output",
+    }
+
+    # The PNG is streamed as received (only on HTTP 200), no need to
+    # buffer, decode or re-encode it. It goes to a temporary file next to
+    # save_path first, so a bad download never replaces an existing file
+    part_path = f"{save_path}.part"
+    try:
+        response = backend_download(
+            "/view", part_path, params=params, timeout=15, base_url=base_url
+        )
+
+        if response is None:
+            return None, 0, False
+        if response.status_code != 200:
+            return response.status_code, 0, False
+
+        size = os.path.getsize(part_path)
+
+        # A body shorter than announced was cut off, no need to look inside it
+        # (with a Content-Encoding the header counts the encoded bytes instead)
+        expected = response.headers.get("Content-Length")
+        if expected and "Content-Encoding" not in response.headers:
+            if size != int(expected):
+                return 200, size, False
+
+        # The backend serves finished PNG files; a missing signature or IEND
+        # trailer means the data is corrupted/truncated
+        if size == 0 or not _is_complete_png(part_path):
+            return 200, size, False
+
+        os.replace(part_path, save_path)
+        return 200, size, True
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    """Get the worker pool doing the result downloads, creating it on first use"""
+    global _FETCH_POOL
+    if _FETCH_POOL is None:
+        _FETCH_POOL = ThreadPoolExecutor(
+            max_workers=_MAX_PARALLEL_FETCHES, thread_name_prefix="diffusion-fetch"
+        )
+    return _FETCH_POOL
+
+
 def fetch_image(history_item):
-    """Simplified fetch function that just tries to get the image"""
+    """Poll the backend for the result image of an item
+
+    The HTTP request runs on a worker thread; this only starts it, checks
+    on it and does the Blender side of the work on the main thread.
+
+    Returns:
+        Seconds until the next poll, or None once the item is done
+    """
+    uuid = history_item.uuid
+    pending = _pending_downloads.get(uuid)
+    if pending is None:
+        return _start_download(history_item)
+
+    future, image_name, save_path = pending
+    if not future.done():
+        return _DOWNLOAD_CHECK_INTERVAL
+
+    del _pending_downloads[uuid]
+    return _finish_download(history_item, future, image_name, save_path)
 
+
+def _start_download(history_item):
     uuid = history_item.uuid
+
+    # Check if we've exceeded maximum attempts (prevent infinite retries),
+    # before doing any other work for this poll
+    history_item.fetch_attempts += 1
+    max_attempts = 60  # About 7 minutes with the polling backoff capped at 8 s
+
+    if history_item.fetch_attempts > max_attempts:
+        logger.error("Max fetch attempts (%d) exceeded for %s", max_attempts, uuid)
+        history_item.status = "FAILED"
+        return None
+
     file_name = f"{uuid}_output_00001_.png"
 
-    print(f"Fetching image: {file_name} for UUID: {uuid}")
+    logger.debug("Fetching image: %s for UUID: %s", file_name, uuid)
 
     # Validate URL (this is now done in backend_request, but keep basic validation)
+    # This also resolves the URL on the main thread, where bpy may be used
     from ..functions.utils import get_backend_url
 
     base_url = get_backend_url()
-    print(f"Using backend URL: {base_url}")
+    logger.debug("Using backend URL: %s", base_url)
 
     if not base_url or not base_url.startswith(("http://", "https://")):
-        print(f"Invalid base URL '{base_url}'")
+        logger.error("Invalid base URL '%s'", base_url)
         history_item.status = "FAILED"
         return None
 
-    # Check if we've exceeded maximum attempts (prevent infinite retries)
-    history_item.fetch_attempts += 1
-    max_attempts = 60  # 2 minutes with 2-second intervals
+    try:
+        # Update status to fetching
+        history_item.status = "FETCHING"
 
-    if history_item.fetch_attempts > max_attempts:
-        print(f"Error: Max fetch attempts ({max_attempts}) exceeded for {uuid}")
+        # Output path of the scene owning the item, "//" relative paths
+        # resolved. Blender reads it as a folder plus a file name prefix
+        # (e.g. "//render/frame_"), so the name is appended, not joined
+        file_path = bpy.path.abspath(history_item.id_data.render.filepath)
+
+        # Create a user-friendly image name
+        image_name = (
+            create_user_friendly_name(
+                history_item.prompt, history_item.id, "Diffusion", 20
+            )
+            + ".png"
+        )
+        save_path = f"{file_path}{image_name}"
+
+        future = _get_fetch_pool().submit(
+            _download_result, file_name, save_path, base_url
+        )
+        _pending_downloads[uuid] = (future, image_name, save_path)
+        return _DOWNLOAD_CHECK_INTERVAL
+
+    except Exception as e:
+        logger.error("Failed to retrieve image. Error: %s", e)
         history_item.status = "FAILED"
         return None
 
-    try:
-        params = {
-            "filename": file_name,
-            "subfolder": "blender-texture",
-            "type": "output",
-        }
-
-        # Update status to fetching
-        history_item.status = "FETCHING"
 
-        # print(f"Calling backend_request with params: {params}")
-        response = backend_request("/view", method="GET", params=params, timeout=15)
+def _finish_download(history_item, future: Future, image_name: str, save_path: str):
+    try:
+        status_code, size, is_complete = future.result()
 
-        if response is None:
-            print("Backend request returned None - connection failed")
+        if status_code is None:
+            logger.error("Backend request returned None - connection failed")
             history_item.status = "FAILED"
             return None
 
-        # print(f"Response status: {response.status_code}")
+        # print(f"Response status: {status_code}")
 
-        if response.status_code == 200:
+        if status_code == 200:
             # Check if response has content
-            if len(response.content) == 0:
-                print("Warning: Empty response content, retrying...")
-                return 1.0  # Retry
+            if size == 0:
+                logger.warning("Empty response content, retrying...")
+                return 1.0  # Retry, the backend may not have the file yet
 
             try:
-                # Success!
-                print("Image fetched successfully")
-
-                image = Image.open(BytesIO(response.content))
-
-                # Verify image is complete by trying to load it
-                image.verify()
-                # Re-open after verify (verify closes the image)
-                image = Image.open(BytesIO(response.content))
+                if not is_complete:
+                    raise ValueError("incomplete PNG data")
 
-                file_path = bpy.data.scenes["Scene"].render.filepath
-
-                # Create a user-friendly image name
-                image_name = (
-                    create_user_friendly_name(
-                        history_item.prompt, history_item.id, "Diffusion", 20
-                    )
-                    + ".png"
-                )
-                save_path = f"{file_path}{image_name}"
-
-                print(f"Saving image to {save_path}")
-                image.save(save_path)
+                # Success!
+                logger.info("Image fetched successfully, saved to %s", save_path)
                 bpy.data.images.load(save_path, check_existing=True)
 
                 # Save the image name in the history item for later reference
@@ -114,37 +276,119 @@ def fetch_image(history_item):
                 # Update status and completion time
                 history_item.status = "COMPLETED"
                 history_item.completed_time = time.perf_counter()
+                history_item.elapsed_display = format_elapsed(
+                    history_item.created_time, history_item.completed_time
+                )
 
-                print(
-                    f"Timing data: created={history_item.created_time:.4f}, completed={history_item.completed_time:.4f}, elapsed={history_item.completed_time - history_item.created_time:.4f}s"
+                logger.debug(
+                    "Timing data: created=%.4f, completed=%.4f, elapsed=%.4fs",
+                    history_item.created_time,
+                    history_item.completed_time,
+                    history_item.completed_time - history_item.created_time,
                 )
 
-                print(f"Applying the Texture {history_item.uuid}")
-                bpy.ops.diffusion.apply_texture(id=history_item.id)
+                logger.debug("Applying the Texture %s", history_item.uuid)
+                # Called directly, the operator would push an undo step
+                # and context on every completed generation
+                from .generation_operators import apply_texture
+
+                applied, message = apply_texture(history_item)
+                if applied:
+                    logger.info(message)
+                else:
+                    logger.error(message)
 
                 return None  # Stop the timer
 
             except Exception as img_error:
-                print(f"Error processing image: {img_error}")
+                logger.warning("Error processing image: %s", img_error)
                 # Retry if image is corrupted/truncated
                 return 1.0
 
-        elif response.status_code == 404:
-            # Still generating, try again in 2 seconds
-            print("Image not ready yet (404), retrying in 2 seconds...")
-            return 2.0
+        elif status_code == 404:
+            # Still generating, back off exponentially (with jitter so
+            # parallel generations do not poll in lockstep)
+            delay = min(max(history_item.next_delay * 1.5, 1.0), 8.0)
+            history_item.next_delay = delay
+            delay += random.uniform(0.0, 0.5)
+            logger.debug(
+                "Image not ready yet (404), retrying in %.1f seconds...", delay
+            )
+            return delay
         else:
             # Other error
-            print(f"Error fetching image: HTTP {response.status_code}")
+            logger.error("Error fetching image: HTTP %s", status_code)
             history_item.status = "FAILED"
             return None
 
+    except OSError as e:
+        # Raised by the worker's file I/O, request failures come back as None
+        logger.error("Could not save the image to %s: %s", save_path, e)
+        history_item.status = "FAILED"
+        return None
     except Exception as e:
-        print(f"Failed to retrieve image. Error: {e}")
+        logger.error("Failed to retrieve image. Error: %s", e)
         history_item.status = "FAILED"
         return None
 
 
+def _global_fetch_tick():
+    """Timer callback polling every generation waiting for its result
+
+    A single timer serves all in-flight generations, so Blender wakes up
+    once per tick however many are queued.
+    """
+    now = time.monotonic()
+    scenes = {scene.as_pointer(): scene for scene in bpy.data.scenes}
+
+    # Items are re-resolved by uuid on every tick, pointers to them would
+    # go stale as soon as the history collection is edited
+    for uuid, (due, scene_pointer) in list(_next_poll.items()):
+        if due > now:
+            continue
+
+        scene = scenes.get(scene_pointer)
+        history_item = (
+            find_history_item_by_uuid(scene.history_properties, uuid)
+            if scene is not None
+            else None
+        )
+        if history_item is None or history_item.status in _TERMINAL_STATUSES:
+            # Finished, or removed from the history (or undone away)
+            del _next_poll[uuid]
+            _pending_downloads.pop(uuid, None)
+            continue
+        if (
+            uuid not in _pending_downloads
+            and len(_pending_downloads) >= _MAX_PARALLEL_FETCHES
+        ):
+            continue  # Every worker is busy, start it on a later tick
+
+        delay = fetch_image(history_item)
+        if delay is None:
+            del _next_poll[uuid]
+        else:
+            _next_poll[uuid] = (now + delay, scene_pointer)
+
+    if not _next_poll:
+        return None  # Nothing left to poll, start_fetch_timer registers again
+
+    # Wake up for the next due poll, within bounds
+    delay = min(due for due, _ in _next_poll.values()) - time.monotonic()
+    return min(max(delay, _MIN_TICK_INTERVAL), _MAX_TICK_INTERVAL)
+
+
+def start_fetch_timer(history_item):
+    """Poll the backend until the result image of the item is ready"""
+    history_item.next_delay = 1.0
+    _next_poll[history_item.uuid] = (
+        time.monotonic() + 1.0,
+        history_item.id_data.as_pointer(),
+    )
+    if not bpy.app.timers.is_registered(_global_fetch_tick):
+        bpy.app.timers.register(_global_fetch_tick, first_interval=1.0)
+
+
 class ObtainMeshObject(bpy.types.Operator):
     bl_idname = "diffusion.obtain_mesh"
     bl_label = "Obtain Mesh Object"
@@ -188,25 +432,22 @@ class UpdateHistoryItem(bpy.types.Operator):
         # Update the history item at the given index
         history_item = history_props.history_collection.add()
         history_item.id = history_props.history_counter
-        history_item.prompt = diffusion_props.prompt
-        history_item.seed = diffusion_props.seed
-        history_item.cfg_scale = diffusion_props.cfg_scale
-        history_item.n_steps = diffusion_props.n_steps
-        history_item.scheduler = diffusion_props.scheduler
-        history_item.negative_prompt = diffusion_props.negative_prompt
-        history_item.width = diffusion_props.width
-        history_item.height = diffusion_props.height
+        copy_changed_settings(
+            history_item, diffusion_props, _SHARED_SETTINGS + ("width", "height")
+        )
         history_item.uuid = self.uuid
         history_item.mesh_name = (
             diffusion_props.mesh_object.name if diffusion_props.mesh_object else "None"
         )
         history_item.model_name = diffusion_props.models_available
+        update_history_display(history_item)
 
         # Set initial status and timestamp
         history_item.status = "GENERATING"
         history_item.created_time = time.perf_counter()
 
         history_props.history_counter = history_props.history_counter + 1
+        index_history_item(history_props, history_item)
         return {"FINISHED"}
 
 
@@ -219,10 +460,7 @@ class FetchHistoryItem(bpy.types.Operator):
 
     def get_history_item(self, context: bpy.types.Context) -> Optional[dict]:
         history_props = context.scene.history_properties
-        for item in history_props.history_collection:
-            if item.uuid == self.uuid:
-                return item
-        return None
+        return find_history_item_by_uuid(history_props, self.uuid)
 
     def execute(self, context: Optional[bpy.types.Context]) -> set[str]:
         assert context is not None
@@ -234,9 +472,7 @@ class FetchHistoryItem(bpy.types.Operator):
             return {"CANCELLED"}
 
         # Add a register on a 1Hz frequency to fetch image result using the id / uuid
-        bpy.app.timers.register(
-            functools.partial(fetch_image, history_item), first_interval=1.0
-        )
+        start_fetch_timer(history_item)
 
         return {"FINISHED"}
 
@@ -248,9 +484,9 @@ class RemoveHistoryItem(bpy.types.Operator):
     id: bpy.props.IntProperty()
 
     def check_collection(self, collections):
-        for collection in collections:
-            if collection.name == "Diffusion Camera History":
-                return collection
+        collection = collections.get("Diffusion Camera History")
+        if collection is not None:
+            return collection
         camera_history_collection = bpy.data.collections.new("Diffusion Camera History")
         assert bpy.context is not None
 
@@ -270,11 +506,10 @@ class RemoveHistoryItem(bpy.types.Operator):
         # remove the camera with the right id
 
         history_camera_collection = self.check_collection(scene.collection.children)
-        for obj in history_camera_collection.objects:
-            if obj.name == f"Camera {self.id}":
-                history_camera_collection.objects.unlink(obj)
-                bpy.data.objects.remove
-                break
+        obj = history_camera_collection.objects.get(f"Camera {self.id}")
+        if obj is not None:
+            history_camera_collection.objects.unlink(obj)
+            bpy.data.objects.remove(obj)
 
         return {"FINISHED"}
 
@@ -291,24 +526,17 @@ class AssignHistoryItem(bpy.types.Operator):
         history_props = scene.history_properties
         diffusion_props = scene.diffusion_properties
 
-        # Loop through the history collection and find the item with the right id
-        for history_item in history_props.history_collection:
-            if history_item.id == self.id:
-                # Update all props
-                diffusion_props.prompt = history_item.prompt
-                diffusion_props.seed = history_item.seed
-                diffusion_props.cfg_scale = history_item.cfg_scale
-                diffusion_props.n_steps = history_item.n_steps
-                diffusion_props.scheduler = history_item.scheduler
-                diffusion_props.negative_prompt = history_item.negative_prompt
-
-                # Show feedback to user
-                self.report(
-                    {"INFO"}, f"✓ Settings loaded from generation #{history_item.id}"
-                )
-                break
-        else:
+        # Find the item with the right id
+        history_item = find_history_item_by_id(history_props, self.id)
+        if history_item is None:
             self.report({"ERROR"}, f"Generation #{self.id} not found")
+            return {"FINISHED"}
+
+        # Update all props
+        copy_changed_settings(diffusion_props, history_item, _SHARED_SETTINGS)
+
+        # Show feedback to user
+        self.report({"INFO"}, f"✓ Settings loaded from generation #{history_item.id}")
 
         return {"FINISHED"}
 
@@ -348,59 +576,96 @@ class RetryGenerationOperator(bpy.types.Operator):
         diffusion_props = scene.diffusion_properties
 
         # Find the failed history item
-        for history_item in history_props.history_collection:
-            if history_item.id == self.id:
-                # Copy settings to diffusion properties
-                diffusion_props.prompt = history_item.prompt
-                diffusion_props.seed = history_item.seed
-                diffusion_props.cfg_scale = history_item.cfg_scale
-                diffusion_props.n_steps = history_item.n_steps
-                diffusion_props.scheduler = history_item.scheduler
-                diffusion_props.negative_prompt = history_item.negative_prompt
-
-                # Set the mesh object if it exists
-                if (
-                    history_item.mesh_name
-                    and history_item.mesh_name in bpy.data.objects
-                ):
-                    diffusion_props.mesh_obj = bpy.data.objects[history_item.mesh_name]
-
-                # Reset timing and counters for fresh retry
-                history_item.created_time = time.perf_counter()
-                history_item.completed_time = 0.0
-                history_item.fetch_attempts = 0  # Reset fetch attempts
-
-                # Clear any existing image name for fresh generation
-                history_item.image_name = ""
-
-                # Trigger the generation using the correct operator
-                try:
-                    # Instead of creating a new generation, reuse this history item
-                    # Reset the status to generating
-                    history_item.status = "GENERATING"
-
-                    # Send request using the existing UUID
-                    bpy.ops.diffusion.send_request(uuid=history_item.uuid)
-
-                    # Launch watchdog to get the result
-                    bpy.ops.diffusion.fetch_history(uuid=history_item.uuid)
-                    self.report({"INFO"}, f"Retrying generation #{history_item.id}")
-                except Exception as e:
-                    # If there's an error during generation, mark as failed
-                    history_item.status = "FAILED"
-                    self.report(
-                        {"ERROR"},
-                        f"Failed to retry generation #{history_item.id}: {str(e)}",
-                    )
-                    return {"CANCELLED"}
-                break
-        else:
+        history_item = find_history_item_by_id(history_props, self.id)
+        if history_item is None:
             self.report({"ERROR"}, f"History item #{self.id} not found")
             return {"CANCELLED"}
 
+        # Copy settings to diffusion properties
+        copy_changed_settings(diffusion_props, history_item, _SHARED_SETTINGS)
+
+        # Set the mesh object if it exists
+        if history_item.mesh_name and history_item.mesh_name in bpy.data.objects:
+            diffusion_props.mesh_obj = bpy.data.objects[history_item.mesh_name]
+
+        # Reset timing and counters for fresh retry
+        history_item.created_time = time.perf_counter()
+        history_item.completed_time = 0.0
+        history_item.elapsed_display = ""
+        history_item.fetch_attempts = 0  # Reset fetch attempts
+        history_item.next_delay = 1.0  # Reset polling backoff
+
+        # Clear any existing image name for fresh generation
+        history_item.image_name = ""
+        update_history_display(history_item)
+
+        # Trigger the generation using the correct operator
+        try:
+            # Instead of creating a new generation, reuse this history item
+            # Reset the status to generating
+            history_item.status = "GENERATING"
+
+            # Send request using the existing UUID and launch the
+            # watchdog to get the result
+            bpy.ops.diffusion.send_and_fetch(uuid=history_item.uuid)
+            self.report({"INFO"}, f"Retrying generation #{history_item.id}")
+        except Exception as e:
+            # If there's an error during generation, mark as failed
+            history_item.status = "FAILED"
+            self.report(
+                {"ERROR"},
+                f"Failed to retry generation #{history_item.id}: {str(e)}",
+            )
+            return {"CANCELLED"}
+
         return {"FINISHED"}
 
 
+class HistoryActionOperator(bpy.types.Operator):
+    """Run an action on the history item of the panel row it is drawn in"""
+
+    bl_idname = "diffusion.history_action"
+    bl_label = "History Action"
+    bl_options = {"REGISTER", "UNDO"}
+
+    action: bpy.props.EnumProperty(
+        name="Action",
+        items=[
+            ("ASSIGN", "Assign", "Load the settings of this generation"),
+            ("RETRY", "Retry", "Retry this failed generation"),
+            ("REMOVE", "Remove", "Remove this generation from the history"),
+        ],
+    )
+
+    @classmethod
+    def description(cls, context, properties):
+        # Tooltip of the button is the description of its action
+        items = cls.bl_rna.properties["action"].enum_items
+        return items[properties.action].description
+
+    def execute(self, context):
+        # Set by the history panel with context_pointer_set
+        history_item = getattr(context, "history_item", None)
+        if history_item is None:
+            self.report({"ERROR"}, "History item not found")
+            return {"CANCELLED"}
+
+        item_id = history_item.id
+        if self.action == "ASSIGN":
+            return bpy.ops.diffusion.assign_history(id=item_id)
+        if self.action == "RETRY":
+            return bpy.ops.diffusion.retry_generation(id=item_id)
+
+        pointer = history_item.as_pointer()
+        history_collection = context.scene.history_properties.history_collection
+        for index, item in enumerate(history_collection):
+            if item.as_pointer() == pointer:
+                return bpy.ops.diffusion.remove_history(index=index, id=item_id)
+
+        self.report({"ERROR"}, "History item not found")
+        return {"CANCELLED"}
+
+
 class CleanupHistoryOperator(bpy.types.Operator):
     bl_idname = "diffusion.cleanup_history_list"
     bl_label = "Clean History List"
@@ -421,12 +686,14 @@ class CleanupHistoryOperator(bpy.types.Operator):
         # Remove completed and failed items (keep pending and generating)
         items_to_remove = []
         for i, history_item in enumerate(history_props.history_collection):
-            if history_item.status in ["COMPLETED", "FAILED"]:
-                items_to_remove.append(i)
-                if history_item.status == "COMPLETED":
-                    completed_items += 1
-                else:
-                    failed_items += 1
+            status = history_item.status
+            if status == "COMPLETED":
+                completed_items += 1
+            elif status == "FAILED":
+                failed_items += 1
+            else:
+                continue
+            items_to_remove.append(i)
 
         # Remove from highest index to lowest to avoid index shifting
         for i in reversed(items_to_remove):
@@ -451,16 +718,27 @@ def history_collection_register():
     bpy.utils.register_class(AssignHistoryItem)
     bpy.utils.register_class(FetchHistoryItem)
     bpy.utils.register_class(RetryGenerationOperator)
+    bpy.utils.register_class(HistoryActionOperator)
     bpy.utils.register_class(CleanupHistoryOperator)
     bpy.utils.register_class(ShowFullPromptOperator)
 
 
 def history_collection_unregister():
+    global _FETCH_POOL
+    if _FETCH_POOL is not None:
+        _FETCH_POOL.shutdown(wait=False, cancel_futures=True)
+        _FETCH_POOL = None
+    _pending_downloads.clear()
+    _next_poll.clear()
+    if bpy.app.timers.is_registered(_global_fetch_tick):
+        bpy.app.timers.unregister(_global_fetch_tick)
+
     bpy.utils.unregister_class(ObtainMeshObject)
     bpy.utils.unregister_class(UpdateHistoryItem)
     bpy.utils.unregister_class(RemoveHistoryItem)
     bpy.utils.unregister_class(AssignHistoryItem)
     bpy.utils.unregister_class(FetchHistoryItem)
     bpy.utils.unregister_class(RetryGenerationOperator)
+    bpy.utils.unregister_class(HistoryActionOperator)
     bpy.utils.unregister_class(CleanupHistoryOperator)
     bpy.utils.unregister_class(ShowFullPromptOperator)
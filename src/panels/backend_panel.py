@@ -37,6 +37,7 @@ class BackendPanel(bpy.types.Panel):
 
         layout.prop(backend_properties, "timeout")
         layout.prop(backend_properties, "timeout_retries")
+        layout.prop(backend_properties, "debug_logging")
 
 
 def register():
@@ -1,9 +1,35 @@
+from itertools import islice
 from typing import Optional
 import bpy
+from bpy.app.handlers import persistent
+
+from ..functions.utils import DIFFUSION_IMAGE_RE, DIFFUSION_MATERIAL_RE
 
 # pyright: reportAttributeAccessIssue=false
 
 
+# Bumped whenever Blender data may have changed (edits, renames, user
+# counts, undo, file loads) so the panel knows when to rescan it
+_data_version = 0
+
+
+@persistent
+def _bump_data_version(*args):
+    global _data_version
+    _data_version += 1
+
+
+# Rows shown per list in the detailed management section
+MAX_LISTED = 5
+
+_VERSION_HANDLERS = (
+    bpy.app.handlers.depsgraph_update_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+    bpy.app.handlers.load_post,
+)
+
+
 class CleanupPanel(bpy.types.Panel):
     bl_label = "Cleanup & Management"
     bl_idname = "OBJECT_PT_DiffusionCleanup"
@@ -12,67 +38,74 @@ class CleanupPanel(bpy.types.Panel):
     bl_category = "Diffusion"
     bl_options = {"DEFAULT_CLOSED"}
 
-    def get_diffusion_materials(self):
-        """Get all materials created by the diffusion addon"""
-        diffusion_materials = []
-        for mat in bpy.data.materials:
-            # Check if material was created by diffusion
-            # Use more specific patterns to avoid false positives
-            if (
-                mat.name.startswith("Diffusion_")
-                or
-                # Material_XXX_prompt pattern (specific diffusion naming)
-                (
-                    mat.name.startswith("Material_")
-                    and len(mat.name.split("_")) >= 3
-                    and mat.name.split("_")[1].isdigit()
-                )
-                or
-                # Legacy patterns
-                ("Material " in mat.name and "_" in mat.name)
-                or "diffusion" in mat.name.lower()
-            ):
-                diffusion_materials.append(mat)
-        return diffusion_materials
-
-    def get_diffusion_images(self):
-        """Get all images created by the diffusion addon"""
-        diffusion_images = []
-        for img in bpy.data.images:
-            # Check if image was created by diffusion
-            if (
-                img.name.startswith("Diffusion_")
-                or ("Generation_" in img.name)
-                or ("_output_" in img.name)
-                or ("diffusion" in img.name.lower())
-            ):
-                diffusion_images.append(img)
-        return diffusion_images
-
-    def get_orphaned_data(self):
-        """Get materials and images with 0 users"""
-        orphaned_materials = [mat for mat in bpy.data.materials if mat.users == 0]
-        orphaned_images = [img for img in bpy.data.images if img.users == 0]
+    # Scan results of the last redraw. Names rather than datablocks are kept,
+    # references to removed datablocks would be invalid
+    _cache = {
+        "key": None,
+        "materials": [],
+        "images": [],
+        "material_count": 0,
+        "image_count": 0,
+        "orphaned_materials": 0,
+        "orphaned_images": 0,
+    }
+
+    def iter_diffusion_materials(self):
+        """Iterate over the materials created by the diffusion addon"""
+        return (
+            mat for mat in bpy.data.materials if DIFFUSION_MATERIAL_RE.search(mat.name)
+        )
+
+    def iter_diffusion_images(self):
+        """Iterate over the images created by the diffusion addon"""
+        return (img for img in bpy.data.images if DIFFUSION_IMAGE_RE.search(img.name))
+
+    def count_orphaned_data(self):
+        """Count materials and images with 0 users"""
+        orphaned_materials = sum(1 for mat in bpy.data.materials if mat.users == 0)
+        orphaned_images = sum(1 for img in bpy.data.images if img.users == 0)
         return orphaned_materials, orphaned_images
 
+    def get_cached_data(self):
+        """Get the scan results, rescanning only when the data has changed"""
+        cache = self._cache
+        key = (_data_version, len(bpy.data.materials), len(bpy.data.images))
+        if cache["key"] != key:
+            # Only the listed rows need names, the rest is just counted
+            materials = self.iter_diffusion_materials()
+            cache["materials"] = [mat.name for mat in islice(materials, MAX_LISTED)]
+            cache["material_count"] = len(cache["materials"]) + sum(
+                1 for _ in materials
+            )
+            images = self.iter_diffusion_images()
+            cache["images"] = [img.name for img in islice(images, MAX_LISTED)]
+            cache["image_count"] = len(cache["images"]) + sum(1 for _ in images)
+
+            orphaned_materials, orphaned_images = self.count_orphaned_data()
+            cache["orphaned_materials"] = orphaned_materials
+            cache["orphaned_images"] = orphaned_images
+            cache["key"] = key
+        return cache
+
     def draw(self, context: Optional[bpy.types.Context]):
         assert context is not None
         layout = self.layout
 
         # Get data counts
-        diffusion_materials = self.get_diffusion_materials()
-        diffusion_images = self.get_diffusion_images()
-        orphaned_materials, orphaned_images = self.get_orphaned_data()
+        cache = self.get_cached_data()
+        material_count = cache["material_count"]
+        image_count = cache["image_count"]
+        orphaned_count = cache["orphaned_materials"] + cache["orphaned_images"]
 
         # Statistics section
         stats_box = layout.box()
         stats_box.label(text="Statistics", icon="INFO")
 
         col = stats_box.column(align=True)
-        col.label(text=f"Diffusion Materials: {len(diffusion_materials)}")
-        col.label(text=f"Diffusion Images: {len(diffusion_images)}")
-        col.label(text=f"Orphaned Materials: {len(orphaned_materials)}")
-        col.label(text=f"Orphaned Images: {len(orphaned_images)}")
+        col.label(text=f"Diffusion Materials: {material_count}")
+        col.label(text=f"Diffusion Images: {image_count}")
+        col.label(text=f"Orphaned Materials: {cache['orphaned_materials']}")
+        col.label(text=f"Orphaned Images: {cache['orphaned_images']}")
 
         layout.separator()
 
@@ -83,10 +116,10 @@ class CleanupPanel(bpy.types.Panel):
         col = cleanup_box.column(align=True)
 
         # Clean orphaned data
-        if orphaned_materials or orphaned_images:
+        if orphaned_count:
             cleanup_op = col.operator(
                 "diffusion.cleanup_orphaned",
-                text=f"Clean Orphaned Data ({len(orphaned_materials + orphaned_images)})",
+                text=f"Clean Orphaned Data ({orphaned_count})",
                 icon="TRASH",
             )
         else:
@@ -97,10 +130,10 @@ class CleanupPanel(bpy.types.Panel):
             )
 
         # Clean all diffusion data
-        if diffusion_materials or diffusion_images:
+        if material_count or image_count:
             cleanup_all_op = col.operator(
                 "diffusion.cleanup_all_diffusion",
-                text=f"Clean All Diffusion Data ({len(diffusion_materials + diffusion_images)})",
+                text=f"Clean All Diffusion Data ({material_count + image_count})",
                 icon="ERROR",
             )
         else:
@@ -119,15 +152,16 @@ class CleanupPanel(bpy.types.Panel):
         detail_box.label(text="Detailed Management", icon="OUTLINER")
 
         # Materials section
-        if diffusion_materials:
+        if material_count:
             mat_row = detail_box.row()
-            mat_row.label(
-                text=f"Materials ({len(diffusion_materials)}):", icon="MATERIAL"
-            )
+            mat_row.label(text=f"Materials ({material_count}):", icon="MATERIAL")
             mat_row.operator("diffusion.cleanup_materials", text="Clean All", icon="X")
 
             # Show first few materials with individual delete buttons
-            for i, mat in enumerate(diffusion_materials[:5]):  # Show max 5
+            for i, mat_name in enumerate(cache["materials"]):
+                mat = bpy.data.materials.get(mat_name)
+                if mat is None:
+                    continue
                 row = detail_box.row()
 
                 # Check if this material is active on current object
@@ -148,17 +182,20 @@ class CleanupPanel(bpy.types.Panel):
                 delete_op = row.operator("diffusion.delete_material", text="", icon="X")
                 delete_op.material_name = mat.name
 
-            if len(diffusion_materials) > 5:
-                detail_box.label(text=f"  ... and {len(diffusion_materials) - 5} more")
+            if material_count > MAX_LISTED:
+                detail_box.label(text=f"  ... and {material_count - MAX_LISTED} more")
 
         # Images section
-        if diffusion_images:
+        if image_count:
             img_row = detail_box.row()
-            img_row.label(text=f"Images ({len(diffusion_images)}):", icon="IMAGE_DATA")
+            img_row.label(text=f"Images ({image_count}):", icon="IMAGE_DATA")
             img_row.operator("diffusion.cleanup_images", text="Clean All", icon="X")
 
             # Show first few images with individual delete buttons
-            for i, img in enumerate(diffusion_images[:5]):  # Show max 5
+            for i, img_name in enumerate(cache["images"]):
+                img = bpy.data.images.get(img_name)
+                if img is None:
+                    continue
                 row = detail_box.row()
 
                 # Make image name clickable to select it
@@ -172,16 +209,21 @@ class CleanupPanel(bpy.types.Panel):
                 delete_op = row.operator("diffusion.delete_image", text="", icon="X")
                 delete_op.image_name = img.name
 
-            if len(diffusion_images) > 5:
-                detail_box.label(text=f"  ... and {len(diffusion_images) - 5} more")
+            if image_count > MAX_LISTED:
+                detail_box.label(text=f"  ... and {image_count - MAX_LISTED} more")
 
-        if not diffusion_materials and not diffusion_images:
+        if not material_count and not image_count:
             detail_box.label(text="No diffusion data found", icon="CHECKMARK")
 
 
 def register():
     bpy.utils.register_class(CleanupPanel)
+    for handlers in _VERSION_HANDLERS:
+        handlers.append(_bump_data_version)
 
 
 def unregister():
+    for handlers in _VERSION_HANDLERS:
+        if _bump_data_version in handlers:
+            handlers.remove(_bump_data_version)
     bpy.utils.unregister_class(CleanupPanel)
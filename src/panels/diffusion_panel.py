@@ -125,15 +125,6 @@ class UpscalerPanel(bpy.types.Panel):
 
 
 # Register classes
-def register():
-    bpy.utils.register_class(DiffusionPanel)
-    bpy.utils.register_class(AdvancedDiffusionPanel)
-    bpy.utils.register_class(LoRAPanel)
-    bpy.utils.register_class(UpscalerPanel)
-
-
-def unregister():
-    bpy.utils.unregister_class(DiffusionPanel)
-    bpy.utils.unregister_class(AdvancedDiffusionPanel)
-    bpy.utils.unregister_class(LoRAPanel)
-    bpy.utils.unregister_class(UpscalerPanel)
+_classes = (DiffusionPanel, AdvancedDiffusionPanel, LoRAPanel, UpscalerPanel)
+
+register, unregister = bpy.utils.register_classes_factory(_classes)
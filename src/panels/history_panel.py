@@ -2,9 +2,33 @@ from typing import Optional
 
 import bpy
 
+from ..properties.history_properties import format_elapsed, format_history_details
+
 # pyright: reportAttributeAccessIssue=false
 
 
+# Icon shown next to each generation status
+_STATUS_ICONS = {
+    "PENDING": "TIME",
+    "GENERATING": "SETTINGS",
+    "FETCHING": "IMPORT",
+    "COMPLETED": "CHECKMARK",
+    "FAILED": "ERROR",
+}
+
+# Label shown for each generation status
+_STATUS_LABELS = {
+    "PENDING": "Pending",
+    "GENERATING": "Generating",
+    "FETCHING": "Fetching",
+    "COMPLETED": "Completed",
+    "FAILED": "Failed",
+}
+
+# Most recent generations listed unless "Show All" is enabled
+MAX_SHOWN = 20
+
+
 class HistoryPanel(bpy.types.Panel):
     bl_label = "History Panel"
     bl_idname = "OBJECT_PT_HistoryPanel"
@@ -21,64 +45,68 @@ class HistoryPanel(bpy.types.Panel):
 
         layout.label(text="Generation History", icon="PACKAGE")
 
-        # Add cleanup button at the top
-        if len(history_props.history_collection) > 0:
-            cleanup_row = layout.row()
-            cleanup_row.operator(
-                "diffusion.cleanup_history_list",
-                text="Clean History",
-                icon="BRUSH_DATA",
-            )
+        history_collection = history_props.history_collection
+        item_count = len(history_collection)
 
-        if len(history_props.history_collection) == 0:
+        if item_count == 0:
             layout.label(text="No generations yet", icon="INFO")
             return
 
-        # Iterate in reverse order to show most recent items first
-        for i, history_item in enumerate(reversed(history_props.history_collection)):
-            # Calculate original index for removal operations
-            original_index = len(history_props.history_collection) - 1 - i
+        # Add cleanup button at the top
+        cleanup_row = layout.row()
+        cleanup_row.operator(
+            "diffusion.cleanup_history_list",
+            text="Clean History",
+            icon="BRUSH_DATA",
+        )
+        cleanup_row.prop(history_props, "show_details", text="", icon="PREFERENCES")
+
+        show_details = history_props.show_details
+        show_all = history_props.show_all
+        first_shown = 0 if show_all else max(item_count - MAX_SHOWN, 0)
+
+        # Iterate in reverse order to show most recent items first; indexing
+        # directly, reversed() on the collection copies it into a list first
+        for original_index in range(item_count - 1, first_shown - 1, -1):
+            history_item = history_collection[original_index]
+            item_id = history_item.id
 
             # Main item box
             box = layout.box()
 
             # Header row with ID, status and actions
             header_row = box.row()
-            header_row.label(text=f"#{history_item.id}", icon="RENDER_STILL")
+            header_row.label(text=f"#{item_id}", icon="RENDER_STILL")
 
             # Status with appropriate icon and color
-            status_icons = {
-                "PENDING": "TIME",
-                "GENERATING": "SETTINGS",
-                "FETCHING": "IMPORT",
-                "COMPLETED": "CHECKMARK",
-                "FAILED": "ERROR",
-            }
-
+            status = history_item.status
             status_row = header_row.row()
             status_row.label(
-                text=history_item.status.title(),
-                icon=status_icons.get(history_item.status, "QUESTION"),
+                text=_STATUS_LABELS.get(status, status),
+                icon=_STATUS_ICONS.get(status, "QUESTION"),
             )
 
-            # Action buttons
+            # Action buttons; the row hands the item to the operator, the
+            # buttons only pick the action
             actions_row = header_row.row(align=True)
-            if history_item.status == "COMPLETED":
-                assign_op = actions_row.operator(
-                    "diffusion.assign_history", text="", icon="RESTRICT_SELECT_OFF"
-                )
-                assign_op.id = history_item.id
-            elif history_item.status == "FAILED":
-                retry_op = actions_row.operator(
-                    "diffusion.retry_generation", text="", icon="FILE_REFRESH"
-                )
-                retry_op.id = history_item.id
+            actions_row.context_pointer_set("history_item", history_item)
+            if status == "COMPLETED":
+                actions_row.operator(
+                    "diffusion.history_action", text="", icon="RESTRICT_SELECT_OFF"
+                ).action = "ASSIGN"
+            elif status == "FAILED":
+                actions_row.operator(
+                    "diffusion.history_action", text="", icon="FILE_REFRESH"
+                ).action = "RETRY"
 
-            remove_op = actions_row.operator(
-                "diffusion.remove_history", text="", icon="X"
-            )
-            remove_op.index = original_index
-            remove_op.id = history_item.id
+            actions_row.operator(
+                "diffusion.history_action", text="", icon="X"
+            ).action = "REMOVE"
+
+            if not show_details:
+                continue
+
+            prompt = history_item.prompt
 
             # Details section (collapsible)
             details_row = box.row()
@@ -86,56 +114,53 @@ class HistoryPanel(bpy.types.Panel):
 
             # Prompt (truncated with tooltip button)
             prompt_row = details_col.row(align=True)
-            prompt_display = (
-                history_item.prompt[:50] + "..."
-                if len(history_item.prompt) > 50
-                else history_item.prompt
-            )
+            truncated = len(prompt) > 50
+            prompt_display = prompt[:50] + "..." if truncated else prompt
             prompt_row.label(text=f"Prompt: {prompt_display}")
 
             # Add tooltip button if prompt is truncated
-            if len(history_item.prompt) > 50:
+            if truncated:
                 tooltip_op = prompt_row.operator(
                     "diffusion.show_full_prompt", text="", icon="COPY_ID"
                 )
-                tooltip_op.full_prompt = history_item.prompt
+                tooltip_op.full_prompt = prompt
 
-            # Technical details in a grid
-            grid = details_col.grid_flow(columns=2, even_columns=True)
-            grid.label(text=f"Seed: {history_item.seed}")
-            grid.label(text=f"Steps: {history_item.n_steps}")
-            grid.label(text=f"CFG: {history_item.cfg_scale}")
-            grid.label(text=f"Size: {history_item.width}x{history_item.height}")
+            # Technical details, formatted when the item was created
+            details_display = history_item.details_display
+            if details_display:
+                source_display = history_item.source_display
+            else:
+                # Item saved before the display strings were stored
+                details_display, source_display = format_history_details(history_item)
 
-            if history_item.model_name:
-                grid.label(text=f"Model: {history_item.model_name}")
-            if history_item.mesh_name:
-                grid.label(text=f"Mesh: {history_item.mesh_name}")
+            details_col.label(text=details_display)
+            if source_display:
+                details_col.label(text=source_display)
 
             # Time info for completed items
-            if history_item.status == "COMPLETED":
-                if history_item.completed_time > 0 and history_item.created_time > 0:
-                    elapsed = history_item.completed_time - history_item.created_time
-                    if elapsed > 0:
-                        details_col.label(text=f"Completed in {elapsed:.1f}s")
-                    else:
-                        details_col.label(
-                            text=f"Timing error: created={history_item.created_time:.1f}, completed={history_item.completed_time:.1f}"
-                        )
-                else:
-                    missing_data = []
-                    if history_item.completed_time <= 0:
-                        missing_data.append("completed_time")
-                    if history_item.created_time <= 0:
-                        missing_data.append("created_time")
-                    details_col.label(text=f"Missing: {', '.join(missing_data)}")
+            if status == "COMPLETED":
+                elapsed_display = history_item.elapsed_display
+                if not elapsed_display:
+                    # Item completed before the display string was stored
+                    elapsed_display = format_elapsed(
+                        history_item.created_time, history_item.completed_time
+                    )
+                details_col.label(text=elapsed_display)
 
             layout.separator()
 
-
-def register():
-    bpy.utils.register_class(HistoryPanel)
+        # Toggle between the most recent generations and the whole history
+        if item_count > MAX_SHOWN:
+            layout.prop(
+                history_props,
+                "show_all",
+                text=(
+                    "Show Recent Only"
+                    if show_all
+                    else f"Show All ({item_count - MAX_SHOWN} more)"
+                ),
+                toggle=True,
+            )
 
 
-def unregister():
-    bpy.utils.unregister_class(HistoryPanel)
+register, unregister = bpy.utils.register_classes_factory((HistoryPanel,))
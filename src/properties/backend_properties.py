@@ -1,8 +1,36 @@
 import bpy
-import requests
+from bpy.app.handlers import persistent
 
 # Import our centralized backend function
-from ..functions.utils import backend_request
+from ..functions.utils import backend_request, invalidate_url_cache, set_debug_logging
+from .diffusion_properties import invalidate_enum_caches
+
+
+def update_debug_logging(self, context):
+    set_debug_logging(self.debug_logging)
+
+
+def _apply_debug_logging():
+    """Sync the logger with the setting stored in the current scene"""
+    # The context is restricted while add-ons load at startup, the
+    # load_post handler covers that case once the file is open
+    scene = getattr(bpy.context, "scene", None)
+    if scene is not None:
+        set_debug_logging(scene.backend_properties.debug_logging)
+
+
+@persistent
+def _on_load_post(*args):
+    # Nothing cached for the previous file applies to the loaded one
+    invalidate_url_cache()
+    invalidate_enum_caches()
+    _apply_debug_logging()
+
+
+def update_backend(self, context):
+    # Lists fetched from the previous backend do not apply to the new one
+    invalidate_url_cache()
+    invalidate_enum_caches()
 
 
 class ConnectBackendOperator(bpy.types.Operator):
@@ -11,8 +39,13 @@ class ConnectBackendOperator(bpy.types.Operator):
     bl_description = "Connect to the backend server"
 
     def execute(self, context):
+        import requests
+
         backend_props = context.scene.backend_properties
 
+        # Re-read the URL in case the scene or file changed since the last call
+        invalidate_url_cache()
+
         # Set connecting state
         backend_props.is_connecting = True
 
@@ -23,9 +56,6 @@ class ConnectBackendOperator(bpy.types.Operator):
         # Update UI to show we're connecting
         self.report({"INFO"}, "Connecting to backend...")
 
-        # Force UI update to show the message immediately
-        bpy.ops.wm.redraw_timer(type="DRAW_WIN_SWAP", iterations=1)
-
         try:
             context.window_manager.progress_update(50)
             # Test connection with a simple endpoint that should always exist
@@ -80,12 +110,8 @@ class DisconnectBackendOperator(bpy.types.Operator):
         backend_props = context.scene.backend_properties
         backend_props.is_connected = False
 
-        # Clear all caches in diffusion properties - import here to avoid circular imports
-        from . import diffusion_properties
-
-        diffusion_properties._global_cache["models"]["data"] = None
-        diffusion_properties._global_cache["loras"]["data"] = None
-        diffusion_properties._global_cache["upscalers"]["data"] = None
+        # Clear all caches in diffusion properties
+        invalidate_enum_caches()
 
         self.report({"INFO"}, "Disconnected from backend")
         return {"FINISHED"}
@@ -101,11 +127,13 @@ class BackendProperties(bpy.types.PropertyGroup):
             ("replicate", "Replicate", "Online interaface to run models using API"),
         ],
         default="comfyui",  # Set a default instead of None
+        update=update_backend,
     )
     url: bpy.props.StringProperty(
         name="URL",
         description="URL to access the backend",
         default="http://127.0.0.1:8188",
+        update=update_backend,
     )
 
     timeout: bpy.props.IntProperty(
@@ -136,6 +164,13 @@ class BackendProperties(bpy.types.PropertyGroup):
         name="History Collection Name", default="Diffusion Camera History"
     )
 
+    debug_logging: bpy.props.BoolProperty(
+        name="Debug Logging",
+        description="Print every backend request to the system console",
+        default=False,
+        update=update_debug_logging,
+    )
+
     # Connection status
     is_connected: bpy.props.BoolProperty(
         name="Connected",
@@ -150,17 +185,22 @@ class BackendProperties(bpy.types.PropertyGroup):
     )
 
 
+_register_classes, _unregister_classes = bpy.utils.register_classes_factory(
+    (ConnectBackendOperator, DisconnectBackendOperator, BackendProperties)
+)
+
+
 def register():
-    bpy.utils.register_class(ConnectBackendOperator)
-    bpy.utils.register_class(DisconnectBackendOperator)
-    bpy.utils.register_class(BackendProperties)
+    _register_classes()
     bpy.types.Scene.backend_properties = bpy.props.PointerProperty(
         type=BackendProperties
     )
+    bpy.app.handlers.load_post.append(_on_load_post)
+    _apply_debug_logging()
 
 
 def unregister():
-    bpy.utils.unregister_class(ConnectBackendOperator)
-    bpy.utils.unregister_class(DisconnectBackendOperator)
-    bpy.utils.unregister_class(BackendProperties)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    _unregister_classes()
     del bpy.types.Scene.backend_properties
@@ -1,178 +1,187 @@
-from typing import List
+import functools
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
 import time
 
 import bpy
-import requests
 
 # Import our centralized backend function
-from ..functions.utils import backend_request
+from ..functions.utils import backend_request, get_backend_url, logger
+
+
+# Fallback items while nothing was fetched yet
+_NONE_ITEMS = (("None", "None", ""),)
+_DISCONNECTED_ITEMS = (("Disconnected", "Connect to backend first", ""),)
+_FALLBACK_ITEMS = {"models": (), "loras": _NONE_ITEMS, "upscalers": _NONE_ITEMS}
+
+_ENUM_CACHE_KEYS = ("models", "loras", "upscalers")
+
+
+def _new_cache_entry(key: str) -> Dict:
+    # "data" is the list returned to Blender. It is only ever updated in
+    # place, on the main thread, so Blender always sees the same list object.
+    # "mono" is the time.monotonic() of the last fetch, so clock changes
+    # cannot expire or freeze the cache; -inf forces the first fetch.
+    # "generation" is bumped on invalidation, fetches started before that
+    # have their results discarded
+    return {
+        "data": list(_FALLBACK_ITEMS[key]),
+        "fetched": None,
+        "mono": float("-inf"),
+        "inflight": False,
+        "generation": 0,
+    }
 
 
 # Global cache to avoid Blender's PropertyGroup write restrictions
 _global_cache = {
-    "models": {"data": None, "time": 0},
-    "loras": {"data": None, "time": 0},
-    "upscalers": {"data": None, "time": 0},
+    "models": _new_cache_entry("models"),
+    "loras": _new_cache_entry("loras"),
+    "upscalers": _new_cache_entry("upscalers"),
     "timeout": 30,  # 30 seconds cache
 }
 
 
-class MeshItem(bpy.types.PropertyGroup):
-    name: bpy.props.StringProperty(name="Mesh Name")
+def invalidate_enum_caches(self=None, context=None):
+    """Drop the cached enum lists (also usable as a property update callback)"""
+    for key in _ENUM_CACHE_KEYS:
+        cache = _global_cache[key]
+        # Reset in place, Blender keeps pointing into the same list; a fetch
+        # still running for the previous backend is ignored from now on
+        cache["generation"] += 1
+        cache["data"][:] = _FALLBACK_ITEMS[key]
+        cache["fetched"] = None
+        cache["mono"] = float("-inf")
+        cache["inflight"] = False
+
+
+def _enum_items(names: List[str], prefix=(), strip=(".safetensors",)) -> List:
+    """Build enum items from backend file names, labelled without extension"""
+    items = list(prefix)
+    for name in names:
+        # Interned, the strings of unchanged names are shared between fetches
+        name = sys.intern(name)
+        label = name
+        for suffix in strip:
+            if name.endswith(suffix):
+                label = sys.intern(name[: -len(suffix)])
+                break
+        items.append((name, label, ""))
+    return items
+
+
+def _fetch_items(route: str, prefix=(), strip=(".safetensors",), base_url=None):
+    """Fetch a backend file list as enum items, None if the request failed"""
+    response = backend_request(route, timeout=5, base_url=base_url)
+    if not response or response.status_code != 200:
+        return None
+    return _enum_items(response.json(), prefix, strip)
+
+
+_fetch_models = functools.partial(
+    _fetch_items, "/models/checkpoints", strip=(".safetensors", ".ckpt")
+)
+_fetch_loras = functools.partial(_fetch_items, "/models/loras", _NONE_ITEMS)
+_fetch_upscalers = functools.partial(
+    _fetch_items, "/models/upscale_models", _NONE_ITEMS
+)
+
+
+def _run_fetch(key: str, generation: int, fetch: Callable[[], Optional[List]]):
+    """Fetch enum items for the cache, runs on a background thread
+
+    The items are only handed over, tagged with the cache generation they
+    were fetched for; _redraw_when_fetched moves them into the cached list
+    on the main thread, where Blender reads it.
+    """
+    cache = _global_cache[key]
+    try:
+        items = fetch()
+        if cache["generation"] == generation:
+            cache["fetched"] = (generation, items)
+    except Exception as e:
+        logger.error("Error fetching %s: %s", key, e)
+    finally:
+        if cache["generation"] == generation:
+            cache["inflight"] = False
+
+
+def _start_fetch(key: str, fetch: Callable[[], Optional[List]]):
+    """Refresh the cached enum items without blocking the redraw"""
+    cache = _global_cache[key]
+    # Only set on the main thread, so one fetch per list at most
+    if cache["inflight"]:
+        return
+    cache["inflight"] = True
+    threading.Thread(
+        target=_run_fetch, args=(key, cache["generation"], fetch), daemon=True
+    ).start()
+
+    if not bpy.app.timers.is_registered(_redraw_when_fetched):
+        bpy.app.timers.register(_redraw_when_fetched, first_interval=0.2)
+
+
+def _redraw_when_fetched():
+    """Timer applying fetched enum items, then redrawing the 3D view panels"""
+    inflight = False
+    for key in _ENUM_CACHE_KEYS:
+        cache = _global_cache[key]
+        # Read before the result, the fetch thread sets them the other way
+        # round, so a finished fetch is never missed
+        inflight = cache["inflight"] or inflight
+        fetched = cache["fetched"]
+        if fetched is not None:
+            cache["fetched"] = None
+            generation, items = fetched
+            if items is not None and generation == cache["generation"]:
+                cache["data"][:] = items
+
+    if inflight:
+        return 0.2
+
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
+    return None
+
+
+def _fetch_enum(context, key: str, fetch: Callable[[], Optional[List]]) -> List:
+    """Items callback body of the enums listing backend files
+
+    Blender calls it on every redraw, so a cache hit returns the cached list
+    right away; a stale cache is refreshed in the background meanwhile.
+    """
+    # Check if backend is connected
+    if not context.scene.backend_properties.is_connected:
+        return _DISCONNECTED_ITEMS
+
+    cache = _global_cache[key]
+    now = time.monotonic()
+    if now - cache["mono"] < _global_cache["timeout"]:
+        return cache["data"]
+
+    # Failed fetches wait for the timeout too
+    cache["mono"] = now
+
+    # Resolve the URL here, the fetch thread must not touch bpy
+    _start_fetch(key, functools.partial(fetch, base_url=get_backend_url()))
+
+    return cache["data"]
 
 
 class DiffusionProperties(bpy.types.PropertyGroup):
 
     # Update the model
     def update_models(self, context):
-        # Check if backend is connected
-        if not context.scene.backend_properties.is_connected:
-            return [("Disconnected", "Connect to backend first", "")]
-
-        # Check cache first
-        current_time = time.time()
-        if (
-            _global_cache["models"]["data"] is not None
-            and current_time - _global_cache["models"]["time"]
-            < _global_cache["timeout"]
-        ):
-            return _global_cache["models"]["data"]
-
-        route = "/models/checkpoints"
-
-        try:
-            response = backend_request(route, timeout=5)
-        except Exception as e:
-            print(f"Error fetching models: {e}")
-            # Return cached data if available, otherwise empty list
-            return (
-                _global_cache["models"]["data"]
-                if _global_cache["models"]["data"] is not None
-                else []
-            )
-
-        if response and response.status_code == 200:
-            models: List[str] = response.json()
-            models_list = [
-                (
-                    model,
-                    model.replace(".safetensors", "").replace(".ckpt", ""),
-                    "",
-                )
-                for model in models
-            ]
-            # Update cache
-            _global_cache["models"]["data"] = models_list
-            _global_cache["models"]["time"] = current_time
-        else:
-            models_list = (
-                _global_cache["models"]["data"]
-                if _global_cache["models"]["data"] is not None
-                else []
-            )
-
-        return models_list
+        return _fetch_enum(context, "models", _fetch_models)
 
     def update_loras(self, context):
-        # Check if backend is connected
-        if not context.scene.backend_properties.is_connected:
-            return [("Disconnected", "Connect to backend first", "")]
-
-        # Check cache first
-        current_time = time.time()
-        if (
-            _global_cache["loras"]["data"] is not None
-            and current_time - _global_cache["loras"]["time"] < _global_cache["timeout"]
-        ):
-            return _global_cache["loras"]["data"]
-
-        base_url = context.scene.backend_properties.url
-        route = "/models/loras"
-
-        output = [("None", "None", "")]
-
-        try:
-            response = requests.get(f"{base_url}{route}", timeout=5)
-        except requests.RequestException as e:
-            print(f"Error fetching loras: {e}")
-            return (
-                _global_cache["loras"]["data"]
-                if _global_cache["loras"]["data"] is not None
-                else output
-            )
-
-        if response.status_code == 200:
-            loras: List[str] = response.json()
-            loras_list = [
-                (
-                    lora,
-                    lora.replace(".safetensors", ""),
-                    "",
-                )
-                for lora in loras
-            ]
-            result = output + loras_list
-            # Update cache
-            _global_cache["loras"]["data"] = result
-            _global_cache["loras"]["time"] = current_time
-            return result
-        else:
-            return (
-                _global_cache["loras"]["data"]
-                if _global_cache["loras"]["data"] is not None
-                else output
-            )
+        return _fetch_enum(context, "loras", _fetch_loras)
 
     def update_upscalers(self, context):
-        # Check if backend is connected
-        if not context.scene.backend_properties.is_connected:
-            return [("Disconnected", "Connect to backend first", "")]
-
-        # Check cache first
-        current_time = time.time()
-        if (
-            _global_cache["upscalers"]["data"] is not None
-            and current_time - _global_cache["upscalers"]["time"]
-            < _global_cache["timeout"]
-        ):
-            return _global_cache["upscalers"]["data"]
-
-        base_url = context.scene.backend_properties.url
-        route = "/models/upscale_models"
-
-        output = [("None", "None", "")]
-
-        try:
-            response = requests.get(f"{base_url}{route}", timeout=5)
-        except requests.RequestException as e:
-            print(f"Error fetching upscalers: {e}")
-            return (
-                _global_cache["upscalers"]["data"]
-                if _global_cache["upscalers"]["data"] is not None
-                else output
-            )
-
-        if response.status_code == 200:
-            upscalers: List[str] = response.json()
-            upscalers_list = [
-                (
-                    upscaler,
-                    upscaler.replace(".safetensors", ""),
-                    "",
-                )
-                for upscaler in upscalers
-            ]
-            result = output + upscalers_list
-            # Update cache
-            _global_cache["upscalers"]["data"] = result
-            _global_cache["upscalers"]["time"] = current_time
-            return result
-        else:
-            return (
-                _global_cache["upscalers"]["data"]
-                if _global_cache["upscalers"]["data"] is not None
-                else output
-            )
+        return _fetch_enum(context, "upscalers", _fetch_upscalers)
 
     mesh_object: bpy.props.PointerProperty(type=bpy.types.Object)
 
@@ -333,15 +342,20 @@ class DiffusionProperties(bpy.types.PropertyGroup):
     )
 
 
+_register_classes, _unregister_classes = bpy.utils.register_classes_factory(
+    (DiffusionProperties,)
+)
+
+
 def register():
-    bpy.utils.register_class(MeshItem)
-    bpy.utils.register_class(DiffusionProperties)
+    _register_classes()
     bpy.types.Scene.diffusion_properties = bpy.props.PointerProperty(
         type=DiffusionProperties
     )
 
 
 def unregister():
-    bpy.utils.unregister_class(MeshItem)
-    bpy.utils.unregister_class(DiffusionProperties)
+    if bpy.app.timers.is_registered(_redraw_when_fetched):
+        bpy.app.timers.unregister(_redraw_when_fetched)
+    _unregister_classes()
     del bpy.types.Scene.diffusion_properties
@@ -1,6 +1,14 @@
+from typing import Dict, Optional, Tuple
+
 import bpy
 
 
+# Lookup indices (field value -> collection index) per HistoryProperties.
+# Entries are validated on use and rebuilt when stale, so undo, file
+# loads and removals never return a wrong item
+_history_index: Dict[Tuple[int, str], Dict] = {}
+
+
 class HistoryItem(bpy.types.PropertyGroup):
     id: bpy.props.IntProperty(name="History ID")
     prompt: bpy.props.StringProperty(name="Prompt")
@@ -10,7 +18,6 @@ class HistoryItem(bpy.types.PropertyGroup):
     scheduler: bpy.props.StringProperty(name="Scheduler")
     negative_prompt: bpy.props.StringProperty(name="Negative Prompt")
     uuid: bpy.props.StringProperty(name="UUID")
-    url: bpy.props.StringProperty(name="URL")
     mesh_name: bpy.props.StringProperty(name="Mesh Name")
 
     # Simplified status system
@@ -42,10 +49,16 @@ class HistoryItem(bpy.types.PropertyGroup):
 
     # Retry tracking
     fetch_attempts: bpy.props.IntProperty(name="Fetch Attempts", default=0)
+    next_delay: bpy.props.FloatProperty(name="Next Poll Delay", default=1.0)
 
     # Texture-only generation flag
     texture_only: bpy.props.BoolProperty(name="Texture Only", default=False)
 
+    # Detail lines of the history panel, formatted once on creation
+    details_display: bpy.props.StringProperty(name="Details Display")
+    source_display: bpy.props.StringProperty(name="Source Display")
+    elapsed_display: bpy.props.StringProperty(name="Elapsed Display")
+
 
 class HistoryProperties(bpy.types.PropertyGroup):
 
@@ -54,16 +67,119 @@ class HistoryProperties(bpy.types.PropertyGroup):
     # Counter for generation ID
     history_counter: bpy.props.IntProperty(name="History Counter", default=0)
 
+    # History panel display options
+    show_details: bpy.props.BoolProperty(
+        name="Show Details",
+        description="Show prompt and settings of every generation, not only its status",
+        default=True,
+    )
+    show_all: bpy.props.BoolProperty(
+        name="Show All",
+        description="List the whole history instead of the most recent generations",
+        default=False,
+    )
+
+
+def _rebuild_index(history_props, field: str) -> Dict:
+    index = {
+        getattr(item, field): i
+        for i, item in enumerate(history_props.history_collection)
+    }
+    _history_index[(history_props.as_pointer(), field)] = index
+    return index
+
+
+def _find_history_item(history_props, field: str, key) -> Optional[HistoryItem]:
+    collection = history_props.history_collection
+    index = _history_index.get((history_props.as_pointer(), field))
+    if index is not None:
+        i = index.get(key)
+        if i is not None and i < len(collection):
+            item = collection[i]
+            if getattr(item, field) == key:
+                return item
+
+    # Missing or stale index, rebuild it once
+    i = _rebuild_index(history_props, field).get(key)
+    return collection[i] if i is not None else None
+
+
+def find_history_item_by_uuid(history_props, uuid: str) -> Optional[HistoryItem]:
+    """Find a history item by generation UUID"""
+    return _find_history_item(history_props, "uuid", uuid)
+
+
+def find_history_item_by_id(history_props, item_id: int) -> Optional[HistoryItem]:
+    """Find a history item by its history ID"""
+    return _find_history_item(history_props, "id", item_id)
+
+
+def index_history_item(history_props, item: HistoryItem):
+    """Record a newly added (last) history item in the lookup indices"""
+    last = len(history_props.history_collection) - 1
+    pointer = history_props.as_pointer()
+    for field in ("uuid", "id"):
+        index = _history_index.get((pointer, field))
+        if index is not None:
+            index[getattr(item, field)] = last
+
+
+def format_history_details(item: HistoryItem) -> Tuple[str, str]:
+    """Format the settings and the model/mesh lines shown in the history panel"""
+    details = (
+        f"Seed: {item.seed}  |  Steps: {item.n_steps}  |  CFG: {item.cfg_scale}"
+        f"  |  Size: {item.width}x{item.height}"
+    )
+
+    model_name = item.model_name
+    mesh_name = item.mesh_name
+    if model_name and mesh_name:
+        source = f"Model: {model_name}  |  Mesh: {mesh_name}"
+    elif model_name:
+        source = f"Model: {model_name}"
+    elif mesh_name:
+        source = f"Mesh: {mesh_name}"
+    else:
+        source = ""
+
+    return details, source
+
+
+def format_elapsed(created_time: float, completed_time: float) -> str:
+    """Format the generation time line of a completed item"""
+    if completed_time > 0 and created_time > 0:
+        elapsed = completed_time - created_time
+        if elapsed > 0:
+            return f"Completed in {elapsed:.1f}s"
+        return (
+            f"Timing error: created={created_time:.1f}, completed={completed_time:.1f}"
+        )
+
+    missing_data = []
+    if completed_time <= 0:
+        missing_data.append("completed_time")
+    if created_time <= 0:
+        missing_data.append("created_time")
+    return f"Missing: {', '.join(missing_data)}"
+
+
+def update_history_display(item: HistoryItem):
+    """Store the formatted detail lines of an item, so draws only read them"""
+    item.details_display, item.source_display = format_history_details(item)
+
+
+_register_classes, _unregister_classes = bpy.utils.register_classes_factory(
+    (HistoryItem, HistoryProperties)
+)
+
 
 def register():
-    bpy.utils.register_class(HistoryItem)
-    bpy.utils.register_class(HistoryProperties)
+    _register_classes()
     bpy.types.Scene.history_properties = bpy.props.PointerProperty(
         type=HistoryProperties
     )
 
 
 def unregister():
-    bpy.utils.unregister_class(HistoryItem)
-    bpy.utils.unregister_class(HistoryProperties)
+    _unregister_classes()
     del bpy.types.Scene.history_properties